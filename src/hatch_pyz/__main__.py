@@ -0,0 +1,5 @@
+import sys
+
+from hatch_pyz.cli import main
+
+sys.exit(main())
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import io
+from typing import TYPE_CHECKING, Any
+from zipfile import ZipFile
+
+from hatch_pyz.compression import COMPRESSION_METHODS
+from hatch_pyz.prune import EXTENSION_SUFFIXES
+from hatch_pyz.report import GENERATED_PACKAGE, format_size, parse_record
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from zipfile import ZipInfo
+
+# distribution of the entries no `RECORD` file lists, usually those of the project itself
+UNKNOWN_DISTRIBUTION = "(unknown)"
+MODULE_SUFFIXES = (".py", ".pyc", *EXTENSION_SUFFIXES)
+
+TABLE_ROW = "{:<40} {:>8} {:>12} {:>12} {:>7}"
+DIFF_ROW = "{:<40} {:>8} {:>12} {:>12} {:>12}"
+# paths listed for each set of duplicates in summaries
+DUPLICATE_FILENAMES = 3
+
+METHOD_NAMES = {method: name for name, method in COMPRESSION_METHODS.items()}
+
+
+def get_top_level(filename: str) -> str:
+    """
+    Return the top-level package or module an archive entry belongs to.
+    """
+    if filename == "__main__.py" or filename.startswith("_hatch_pyz/"):
+        return GENERATED_PACKAGE
+    top, _, rest = filename.partition("/")
+    if top == "__pycache__":
+        # bytecode of a top-level module
+        return rest.split(".", 1)[0]
+    if not rest and top.endswith(MODULE_SUFFIXES):
+        return top.split(".", 1)[0]
+    return top
+
+
+def format_delta(size: int) -> str:
+    return f"{'-' if size < 0 else '+'}{format_size(abs(size))}"
+
+
+def format_ratio(file_size: int, compress_size: int) -> str:
+    return f"{compress_size / file_size:.2f}" if file_size else "-"
+
+
+def get_totals(entries: Iterable[ZipInfo]) -> dict[str, int]:
+    totals = {"entries": 0, "file_size": 0, "compress_size": 0}
+    for zip_info in entries:
+        totals["entries"] += 1
+        totals["file_size"] += zip_info.file_size
+        totals["compress_size"] += zip_info.compress_size
+    return totals
+
+
+class ArchiveAnalysis:
+    """
+    Sizes of the entries of a built archive, grouped by top-level package and by distribution.
+
+    Only the central directory is read, which ZipFile finds by itself behind the shebang, along with the small
+    `RECORD` files of bundled distributions to attribute entries to them.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with ZipFile(path) as zf:
+            self.entries = [zip_info for zip_info in zf.infolist() if not zip_info.is_dir()]
+            # archive path of each bundled dependency file to the distribution that installed it
+            self.distributions: dict[str, str] = {}
+            for zip_info in self.entries:
+                dist_info, _, name = zip_info.filename.rpartition("/")
+                if name == "RECORD" and dist_info.endswith(".dist-info") and "/" not in dist_info:
+                    with zf.open(zip_info) as f:
+                        lines = io.TextIOWrapper(f, encoding="utf-8", newline="")
+                        self.distributions.update(parse_record(dist_info, lines))
+
+    def get_distribution(self, filename: str) -> str:
+        return self.distributions.get(filename, UNKNOWN_DISTRIBUTION)
+
+    def group(self, key: Callable[[str], str]) -> dict[str, dict[str, int]]:
+        """
+        Total the entries of each group `key` puts their archive path in, largest compressed size first.
+        """
+        groups: dict[str, list[ZipInfo]] = {}
+        for zip_info in self.entries:
+            groups.setdefault(key(zip_info.filename), []).append(zip_info)
+        totals = {name: get_totals(entries) for name, entries in groups.items()}
+        return dict(sorted(totals.items(), key=lambda item: (-item[1]["compress_size"], item[0])))
+
+    def get_packages(self) -> dict[str, dict[str, int]]:
+        return self.group(get_top_level)
+
+    def get_duplicates(self) -> list[dict[str, Any]]:
+        """
+        Find entries with identical contents, going by their CRC and size, most bytes wasted first.
+        """
+        contents: dict[tuple[int, int], list[ZipInfo]] = {}
+        for zip_info in self.entries:
+            if zip_info.file_size:
+                contents.setdefault((zip_info.CRC, zip_info.file_size), []).append(zip_info)
+
+        duplicates = []
+        for (_, file_size), entries in contents.items():
+            if len(entries) > 1:
+                compress_sizes = sorted(zip_info.compress_size for zip_info in entries)
+                duplicates.append(
+                    {
+                        "file_size": file_size,
+                        # every copy but the smallest could be dropped
+                        "wasted": sum(compress_sizes[1:]),
+                        "filenames": sorted(zip_info.filename for zip_info in entries),
+                    }
+                )
+        return sorted(duplicates, key=lambda duplicate: (-duplicate["wasted"], duplicate["filenames"]))
+
+    def get_methods(self) -> dict[str, int]:
+        methods: dict[str, int] = {}
+        for zip_info in self.entries:
+            name = METHOD_NAMES.get(zip_info.compress_type, str(zip_info.compress_type))
+            methods[name] = methods.get(name, 0) + 1
+        return methods
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "total": get_totals(self.entries),
+            "methods": self.get_methods(),
+            "packages": self.get_packages(),
+            "distributions": self.group(self.get_distribution),
+            "duplicates": self.get_duplicates(),
+        }
+
+    def get_summary(self, top: int) -> str:
+        """
+        Describe the archive in tables of at most `top` rows.
+        """
+        data = self.to_dict()
+        total = data["total"]
+        methods = ", ".join(f"{count} {name}" for name, count in sorted(data["methods"].items()))
+        header = (
+            f"{self.path}: {total['entries']} entries ({methods}), {format_size(total['file_size'])} compressed to "
+            f"{format_size(total['compress_size'])}"
+        )
+        lines = [header]
+        for title in ("packages", "distributions"):
+            lines.extend(["", TABLE_ROW.format(title[:-1], "entries", "size", "compressed", "ratio")])
+            for name, group in list(data[title].items())[:top]:
+                file_size, compress_size = group["file_size"], group["compress_size"]
+                lines.append(
+                    TABLE_ROW.format(
+                        name,
+                        group["entries"],
+                        format_size(file_size),
+                        format_size(compress_size),
+                        format_ratio(file_size, compress_size),
+                    )
+                )
+
+        duplicates = data["duplicates"]
+        wasted = sum(duplicate["wasted"] for duplicate in duplicates)
+        lines.extend(["", f"{len(duplicates)} sets of duplicate contents, wasting {format_size(wasted)}"])
+        for duplicate in duplicates[:top]:
+            filenames = duplicate["filenames"]
+            shown = ", ".join(filenames[:DUPLICATE_FILENAMES])
+            if len(filenames) > DUPLICATE_FILENAMES:
+                shown += f" and {len(filenames) - DUPLICATE_FILENAMES} more"
+            lines.append(f"  {format_size(duplicate['wasted'])} in {len(filenames)} copies: {shown}")
+        return "\n".join(lines)
+
+
+def diff_archives(old: ArchiveAnalysis, new: ArchiveAnalysis) -> dict[str, Any]:
+    """
+    Compare two archives by total, by package and by entry. Entries count as changed when their CRC or size differs.
+    """
+    old_entries = {zip_info.filename: zip_info for zip_info in old.entries}
+    new_entries = {zip_info.filename: zip_info for zip_info in new.entries}
+
+    entries = []
+    for filename in sorted(old_entries.keys() | new_entries.keys()):
+        old_info, new_info = old_entries.get(filename), new_entries.get(filename)
+        if old_info is None:
+            status = "added"
+        elif new_info is None:
+            status = "removed"
+        elif (old_info.CRC, old_info.file_size) != (new_info.CRC, new_info.file_size):
+            status = "changed"
+        else:
+            continue
+        old_size = old_info.compress_size if old_info is not None else 0
+        new_size = new_info.compress_size if new_info is not None else 0
+        entries.append({"filename": filename, "status": status, "old": old_size, "new": new_size})
+
+    old_packages, new_packages = old.get_packages(), new.get_packages()
+    packages = {}
+    for name in old_packages.keys() | new_packages.keys():
+        old_size = old_packages.get(name, {}).get("compress_size", 0)
+        new_size = new_packages.get(name, {}).get("compress_size", 0)
+        old_count = old_packages.get(name, {}).get("entries", 0)
+        new_count = new_packages.get(name, {}).get("entries", 0)
+        if old_size != new_size or old_count != new_count:
+            packages[name] = {"entries": new_count - old_count, "old": old_size, "new": new_size}
+
+    return {
+        "old": {"path": old.path, **get_totals(old.entries)},
+        "new": {"path": new.path, **get_totals(new.entries)},
+        "packages": dict(sorted(packages.items(), key=lambda item: (-abs(item[1]["new"] - item[1]["old"]), item[0]))),
+        "entries": sorted(entries, key=lambda entry: (-abs(entry["new"] - entry["old"]), entry["filename"])),
+    }
+
+
+def format_diff(diff: dict[str, Any], top: int) -> str:
+    old, new = diff["old"], diff["new"]
+    header = (
+        f"{old['path']} -> {new['path']}: {new['entries'] - old['entries']:+d} entries, "
+        f"size {format_delta(new['file_size'] - old['file_size'])}, "
+        f"compressed {format_delta(new['compress_size'] - old['compress_size'])}"
+    )
+    lines = [header]
+
+    lines.extend(["", DIFF_ROW.format("package", "entries", "old", "new", "delta")])
+    for name, package in list(diff["packages"].items())[:top]:
+        lines.append(
+            DIFF_ROW.format(
+                name,
+                f"{package['entries']:+d}",
+                format_size(package["old"]),
+                format_size(package["new"]),
+                format_delta(package["new"] - package["old"]),
+            )
+        )
+
+    counts = {status: 0 for status in ("added", "removed", "changed")}
+    for entry in diff["entries"]:
+        counts[entry["status"]] += 1
+    lines.extend(["", ", ".join(f"{count} {status}" for status, count in counts.items()) + " entries"])
+    for entry in diff["entries"][:top]:
+        delta = format_delta(entry["new"] - entry["old"])
+        lines.append(f"  {entry['status']:<8} {delta:>12}  {entry['filename']}")
+    return "\n".join(lines)
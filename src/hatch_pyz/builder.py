@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import os
+import py_compile
 import stat
+import struct
 import subprocess
 import sys
 import tempfile
 import time
 import zipfile
-from contextlib import contextmanager, nullcontext
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from itertools import chain
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Iterable, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Iterable,
+    Tuple,
+    TypeVar,
+)
 from zipfile import ZipFile, ZipInfo
 
 from hatchling.builders.plugin.interface import BuilderInterface, IncludedFile
@@ -22,7 +38,48 @@ from hatchling.builders.utils import (
     set_zip_info_mode,
 )
 
+from hatch_pyz.bytecode import BytecodeCompiler
+from hatch_pyz.cache import CACHE_ENV_VAR, DependencyCache
+from hatch_pyz.compression import (
+    CHUNK_SIZE,
+    CompressedData,
+    CompressionPolicy,
+    compress_file,
+    compress_stream,
+    get_compresslevel,
+    set_compresslevel,
+)
 from hatch_pyz.config import PyzConfig
+from hatch_pyz.fingerprint import (
+    FINGERPRINT_SUFFIX,
+    Fingerprint,
+    get_artifact_stats,
+    get_fingerprint_path,
+    get_plugin_version,
+)
+from hatch_pyz.incremental import (
+    LOCAL_HEADER_FORMAT,
+    LOCAL_HEADER_SIZE,
+    MANIFEST,
+    MANIFEST_SUFFIX,
+    PreviousArchive,
+    file_digest,
+    get_manifest_path,
+    read_raw_entry,
+    write_manifest,
+)
+from hatch_pyz.launcher import (
+    get_launcher_command,
+    get_shebang,
+    get_sys_path,
+    validate_artifact,
+)
+from hatch_pyz.lock import LockedPackage, LockFile, fetch
+from hatch_pyz.prune import DependencyPruner, get_module_name
+from hatch_pyz.report import REPORT_SUFFIX, BuildReport, get_report_path, read_record
+from hatch_pyz.scan import ScannedFile, get_stat, scan_file, scan_tree
+from hatch_pyz.stored import copy_data, get_checksums
+from hatch_pyz.wheels import WheelArchives, WheelMember
 
 if sys.version_info >= (3, 10):
     from typing import TypeAlias
@@ -35,6 +92,20 @@ if TYPE_CHECKING:
     from hatchling.builders.config import BuilderConfig
 
 TIME_TUPLE: TypeAlias = Tuple[int, int, int, int, int, int]
+T = TypeVar("T")
+
+RUNTIME_DIRECTORY = os.path.join(os.path.dirname(__file__), "runtime")
+RUNTIME_PACKAGE = "_hatch_pyz/__init__.py"
+# offsets of the stored resources of an archive, read by `_hatch_pyz.resources`
+RESOURCE_INDEX = "_hatch_pyz/resources.json"
+
+# only imports the profiler when `HATCH_PYZ_IMPORT_PROFILE` is set, so unprofiled runs pay for a dictionary lookup
+IMPORT_PROFILE_BOOTSTRAP = (
+    "import os",
+    "if os.environ.get('HATCH_PYZ_IMPORT_PROFILE'):",
+    "    from _hatch_pyz.profile import install",
+    "    install(os.environ['HATCH_PYZ_IMPORT_PROFILE'])",
+)
 
 
 def pip_install(dependencies: Sequence[str], target_directory: str) -> None:
@@ -52,21 +123,114 @@ def pip_install(dependencies: Sequence[str], target_directory: str) -> None:
     subprocess.check_call(pip_command + list(dependencies))
 
 
+def pip_install_locked(packages: Sequence[LockedPackage], wheelhouse: str, target_directory: str) -> None:
+    with tempfile.TemporaryDirectory() as temp_directory:
+        requirements = os.path.join(temp_directory, "requirements.txt")
+        with open(requirements, "w", encoding="utf-8") as f:
+            f.writelines(f"{package.to_requirement()}\n" for package in packages)
+
+        pip_command = [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--no-input",
+            "--disable-pip-version-check",
+            "--no-color",
+            "--no-compile",
+            "--no-index",
+            "--no-deps",
+            "--require-hashes",
+            "--find-links", wheelhouse,
+            "--target", target_directory,
+            "--requirement", requirements,
+        ]
+        subprocess.check_call(pip_command)
+
+
+def pip_wheel(dependencies: Sequence[str], wheel_directory: str) -> None:
+    pip_command = [
+        sys.executable,
+        "-m",
+        "pip",
+        "wheel",
+        "--no-input",
+        "--disable-pip-version-check",
+        "--no-color",
+        "--wheel-dir", wheel_directory,
+    ]
+    subprocess.check_call(pip_command + list(dependencies))
+
+
+@contextmanager
+def run_in_background(
+    enter: Callable[[BuildReport], ContextManager[T]], report: BuildReport
+) -> Iterator[Callable[[], T]]:
+    """
+    Enter the context manager returned by `enter` on a background thread, yielding a function that waits for its
+    value. The background work is timed in a report of its own, whose phases are added to `report` as background
+    phases, and the context manager is exited on the calling thread.
+    """
+    background_report = BuildReport()
+    try:
+        with ExitStack() as stack, ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(lambda: stack.enter_context(enter(background_report)))
+
+            def wait() -> T:
+                with report.phase("wait-dependencies"):
+                    return future.result()
+
+            yield wait
+    finally:
+        report.add_background_phases(background_report)
+
+
 class ZipappArchive:
     if sys.platform.startswith("win"):
         shebang_encoding = "utf-8"
     else:
         shebang_encoding = sys.getfilesystemencoding()
 
-    def __init__(self, *, reproducible: bool, compressed: bool, interpreter: str):
+    def __init__(
+        self,
+        *,
+        reproducible: bool,
+        compressed: bool,
+        interpreter: str | None,
+        jobs: int = 1,
+        record_manifest: bool = False,
+        previous: PreviousArchive | None = None,
+        compression_policy: CompressionPolicy | None = None,
+        report: BuildReport | None = None,
+        existing: str | None = None,
+    ):
         self.reproducible = reproducible
+        self.jobs = jobs
+        self.previous = previous
+        self.report = report
+        # content of each added file, used by the next incremental build to find unchanged entries
+        self.manifest: MANIFEST | None = {} if record_manifest else None
         self.compression = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+        self.compression_policy = compression_policy or CompressionPolicy(self.compression)
+        # the same for every entry, so only computed once
+        self.reproducible_time_tuple = self.get_reproducible_time_tuple() if reproducible else None
+
+        # whether an existing archive is updated rather than a temporary one written
+        self.in_place = existing is not None
+        if existing is not None:
+            # entries are appended after the existing ones, and the central directory is rewritten on close
+            self.path = existing
+            self.fd = open(existing, "r+b")  # noqa: SIM115
+            self.zf = ZipFile(self.fd, "a", compression=self.compression)
+            return
 
         raw_fd, self.path = tempfile.mkstemp(suffix=".pyz")
         self.fd = os.fdopen(raw_fd, "w+b")
 
-        shebang = b"#!" + interpreter.encode(self.shebang_encoding) + b"\n"
-        self.fd.write(shebang)
+        # archives that are only put on `sys.path`, such as dependency layers, are not executable
+        if interpreter is not None:
+            shebang = b"#!" + interpreter.encode(self.shebang_encoding) + b"\n"
+            self.fd.write(shebang)
 
         self.zf = ZipFile(self.fd, "w", compression=self.compression)
 
@@ -77,61 +241,313 @@ class ZipappArchive:
         d = datetime.fromtimestamp(get_reproducible_timestamp(), timezone.utc)
         return d.year, d.month, d.day, d.hour, d.minute, d.second
 
-    def add_file(self, included_file: IncludedFile) -> None:
+    def get_zip_info(self, included_file: IncludedFile, file_stat: os.stat_result | None = None) -> ZipInfo:
         relative_path = normalize_archive_path(included_file.distribution_path)
-        file_stat = os.stat(included_file.path)
+        if file_stat is None:
+            file_stat = get_stat(included_file)
 
-        if self.reproducible:
-            zip_info = zipfile.ZipInfo(relative_path, self.get_reproducible_time_tuple())
+        if self.reproducible_time_tuple is not None:
+            zip_info = zipfile.ZipInfo(relative_path, self.reproducible_time_tuple)
 
             # https://github.com/takluyver/flit/pull/66
             new_mode = normalize_file_permissions(file_stat.st_mode)
             set_zip_info_mode(zip_info, new_mode)
-            if stat.S_ISDIR(file_stat.st_mode):
-                zip_info.external_attr |= 0x10
         else:
-            zip_info = zipfile.ZipInfo.from_file(included_file.path, relative_path)
+            # what `ZipInfo.from_file` does, without calling `stat` again
+            zip_info = zipfile.ZipInfo(relative_path, time.localtime(file_stat.st_mtime)[:6])
+            zip_info.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+        if stat.S_ISDIR(file_stat.st_mode):
+            zip_info.external_attr |= 0x10
+
+        # Size the entry up front so zip64 is decided identically by the streaming and precompressed paths
+        zip_info.file_size = file_stat.st_size
+        zip_info.compress_type, compresslevel = self.compression_policy.get(relative_path)
+        set_compresslevel(zip_info, compresslevel)
+        return zip_info
 
-        zip_info.compress_type = self.compression
+    def add_file(self, included_file: IncludedFile) -> None:
+        zip_info = self.get_zip_info(included_file)
+        if zip_info.compress_type == zipfile.ZIP_STORED:
+            self.add_stored_file(included_file.path, zip_info)
+            return
 
+        start = time.perf_counter()
         with open(included_file.path, "rb") as in_file, self.zf.open(zip_info, "w") as out_file:
             while True:
-                chunk = in_file.read(16384)
+                chunk = in_file.read(CHUNK_SIZE)
                 if not chunk:
                     break
                 out_file.write(chunk)
 
+        if self.report is not None:
+            self.report.add_entry(zip_info, time.perf_counter() - start)
+
+    def add_files(self, included_files: Iterable[IncludedFile]) -> None:
+        """
+        Add files to the archive in iteration order. With more than one job, entries are compressed ahead of time by
+        a thread pool (zlib releases the GIL) while this thread appends the finished entries in their original order,
+        so the archive is byte-identical to a serial build.
+        """
+        if self.jobs <= 1 and self.manifest is None and not self.compression_policy.min_savings:
+            for included_file in included_files:
+                self.add_file(included_file)
+            return
+
+        # Bound the number of compressed entries held in memory at once
+        max_pending = self.jobs * 4
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for included_file in included_files:
+                file_stat = get_stat(included_file)
+                zip_info = self.get_zip_info(included_file, file_stat)
+                # stored entries are copied by the kernel when written, there is nothing to prepare
+                future = (
+                    None
+                    if zip_info.compress_type == zipfile.ZIP_STORED
+                    else executor.submit(self.prepare_entry, included_file.path, zip_info, file_stat)
+                )
+                pending.append((included_file.path, zip_info, file_stat, future))
+                if len(pending) >= max_pending:
+                    self.write_prepared_entry(*pending.popleft())
+            while pending:
+                self.write_prepared_entry(*pending.popleft())
+
+    def prepare_entry(
+        self, path: str, zip_info: ZipInfo, file_stat: os.stat_result
+    ) -> tuple[CompressedData, float]:
+        start = time.perf_counter()
+        compressed = self.compress_entry(path, zip_info, file_stat)
+        return compressed, time.perf_counter() - start
+
+    def compress_entry(self, path: str, zip_info: ZipInfo, file_stat: os.stat_result) -> CompressedData:
+        auto_store = bool(self.compression_policy.min_savings)
+        if self.previous is not None:
+            compressed = self.previous.get_entry(path, zip_info, file_stat, auto_store=auto_store)
+            if compressed is not None:
+                return compressed
+
+        digest = self.manifest is not None
+        compressed = compress_file(path, zip_info.compress_type, get_compresslevel(zip_info), digest=digest)
+        if (
+            auto_store
+            and zip_info.compress_type != zipfile.ZIP_STORED
+            and not self.compression_policy.is_worthwhile(compressed)
+        ):
+            zip_info.compress_type = zipfile.ZIP_STORED
+            set_compresslevel(zip_info, None)
+            compressed = compress_file(path, zipfile.ZIP_STORED, digest=digest)
+
+        return compressed
+
+    def write_prepared_entry(
+        self, path: str, zip_info: ZipInfo, file_stat: os.stat_result, future: Future | None
+    ) -> None:
+        if future is None:
+            digest = self.add_stored_file(path, zip_info)
+        else:
+            compressed, seconds = future.result()
+            self.write_compressed(zip_info, compressed)
+            if self.report is not None:
+                self.report.add_entry(zip_info, seconds)
+            digest = compressed.digest
+
+        if self.manifest is not None:
+            self.manifest[zip_info.filename] = {
+                "size": file_stat.st_size,
+                "mtime_ns": file_stat.st_mtime_ns,
+                "sha256": digest,
+            }
+
+    def add_stored_file(self, path: str, zip_info: ZipInfo) -> str | None:
+        """
+        Append a file as a stored entry of `zip_info.file_size` bytes, mapping it into memory to compute its CRC and
+        having the kernel copy its data into the archive. Returns the SHA-256 of the content when recording a
+        manifest.
+        """
+        start = time.perf_counter()
+        with open(path, "rb") as in_file:
+            crc, digest = get_checksums(in_file, zip_info.file_size, digest=self.manifest is not None)
+
+            def write_data() -> None:
+                if copy_data(in_file, self.fd, zip_info.file_size) != zip_info.file_size:
+                    message = f"File `{path}` changed while it was being added to the archive"
+                    raise OSError(message)
+
+            self.write_entry(zip_info, crc, zip_info.file_size, write_data)
+
+        if self.report is not None:
+            self.report.add_entry(zip_info, time.perf_counter() - start)
+        return digest
+
+    def write_compressed(self, zip_info: ZipInfo, compressed: CompressedData) -> None:
+        """
+        Append an entry whose data has already been compressed with `zip_info.compress_type`.
+        """
+        zip_info.file_size = compressed.file_size
+        self.write_entry(zip_info, compressed.crc, len(compressed.data), lambda: self.fd.write(compressed.data))
+
+    def write_entry(self, zip_info: ZipInfo, crc: int, compress_size: int, write_data: Callable[[], object]) -> None:
+        """
+        Append an entry with a known CRC and size, writing its local header and then calling `write_data` to write
+        exactly `compress_size` bytes of data after it.
+        """
+        # Appending entries directly relies on ZipFile internals that have been stable since Python 3.6
+        zf: Any = self.zf
+        if zf._writing:
+            message = "Can't write to the archive while there is another write handle open on it"
+            raise ValueError(message)
+
+        zip_info.CRC = crc
+        zip_info.compress_size = compress_size
+        zip_info.flag_bits = 0x00
+        if zip_info.compress_type == zipfile.ZIP_LZMA:
+            # Compressed data includes an end-of-stream (EOS) marker
+            zip_info.flag_bits |= 0x02
+        if not zip_info.external_attr:
+            zip_info.external_attr = 0o600 << 16
+        # Mirror the zip64 decision ZipFile makes when opening an entry for writing
+        zip64 = zip_info.file_size * 1.05 > zipfile.ZIP64_LIMIT
+
+        with zf._lock:
+            self.fd.seek(zf.start_dir)
+            zip_info.header_offset = self.fd.tell()
+            zf._writecheck(zip_info)
+            zf._didModify = True
+            self.fd.write(zip_info.FileHeader(zip64))
+            write_data()
+            zf.start_dir = self.fd.tell()
+            zf.filelist.append(zip_info)
+            zf.NameToInfo[zip_info.filename] = zip_info
+
+    def copy_entry(self, source: ZipFile, source_info: ZipInfo, arcname: str) -> None:
+        """
+        Copy an entry of another archive, such as a wheel, as `arcname`. When the entry already uses the method this
+        archive would compress it with, its compressed data and CRC are copied as they are, keeping the source's
+        compression level; otherwise it is decompressed and compressed again.
+        """
+        if self.reproducible_time_tuple is not None:
+            zip_info = ZipInfo(arcname, self.reproducible_time_tuple)
+            mode = source_info.external_attr >> 16 or stat.S_IFREG | 0o644
+            set_zip_info_mode(zip_info, normalize_file_permissions(mode))
+        else:
+            zip_info = ZipInfo(arcname, source_info.date_time)
+            zip_info.external_attr = source_info.external_attr
+        zip_info.file_size = source_info.file_size
+        zip_info.compress_type, compresslevel = self.compression_policy.get(arcname)
+        set_compresslevel(zip_info, compresslevel)
+
+        start = time.perf_counter()
+        compressed = None
+        if source_info.compress_type == zip_info.compress_type:
+            data = read_raw_entry(source.fp, source_info)
+            compressed = CompressedData(data, source_info.CRC, source_info.file_size)
+        else:
+            with source.open(source_info) as in_file:
+                compressed = compress_stream(in_file, zip_info.compress_type, compresslevel)
+
+        if (
+            self.compression_policy.min_savings
+            and zip_info.compress_type != zipfile.ZIP_STORED
+            and not self.compression_policy.is_worthwhile(compressed)
+        ):
+            zip_info.compress_type = zipfile.ZIP_STORED
+            set_compresslevel(zip_info, None)
+            with source.open(source_info) as in_file:
+                compressed = compress_stream(in_file, zipfile.ZIP_STORED)
+
+        self.write_compressed(zip_info, compressed)
+        if self.report is not None:
+            self.report.add_entry(zip_info, time.perf_counter() - start)
+
+    def remove_entry(self, arcname: str) -> ZipInfo:
+        """
+        Drop an entry from the central directory. Its data is left in the archive, unreferenced, until it is rebuilt.
+        """
+        zf: Any = self.zf
+        with zf._lock:
+            zip_info = zf.NameToInfo.pop(arcname)
+            zf.filelist.remove(zip_info)
+            zf._didModify = True
+        return zip_info
+
     def write_file(self, path: str, data: bytes | str) -> None:
         arcname = path
-        date_time = self.get_reproducible_time_tuple() if self.reproducible else time.localtime(time.time())[:6]
+        date_time = self.reproducible_time_tuple or time.localtime(time.time())[:6]
         zinfo = ZipInfo(os.fspath(arcname), date_time=date_time)
+        start = time.perf_counter()
         self.zf.writestr(zinfo, data, compress_type=self.compression)
+        if self.report is not None:
+            self.report.add_entry(zinfo, time.perf_counter() - start)
+
+    def write_runtime_module(self, name: str) -> None:
+        """
+        Copy a module from `hatch_pyz.runtime` into the archive's `_hatch_pyz` package.
+        """
+        if RUNTIME_PACKAGE not in self.zf.NameToInfo:
+            self.write_file(RUNTIME_PACKAGE, "")
+        self.write_file(f"_hatch_pyz/{name}.py", Path(RUNTIME_DIRECTORY, f"{name}.py").read_bytes())
+
+    def get_build_id(self) -> str:
+        """
+        Identify the archive contents written so far by the names, checksums and sizes of their entries.
+        """
+        hasher = hashlib.sha256()
+        for zip_info in self.zf.filelist:
+            hasher.update(f"{zip_info.filename}\0{zip_info.CRC}\0{zip_info.file_size}\n".encode())
+        return hasher.hexdigest()[:16]
 
-    def write_dunder_main(self, module: str, function: str) -> None:
+    def write_dunder_main(self, module: str, function: str, bootstrap: Sequence[str] = ()) -> None:
         _dunder_main = "\n".join(
             (
                 "# -*- coding: utf-8 -*-",
+                *bootstrap,
                 f"import {module}",
                 f"{module}.{function}()",
             )
         )
         self.write_file("__main__.py", _dunder_main)
 
+    def write_resource_index(self) -> None:
+        """
+        Record where the local header and the data of every stored entry other than a module start in the archive file,
+        so that `_hatch_pyz.resources` can return views of the data without reading the central directory or copying.
+        """
+        entries = {}
+        for zip_info in self.zf.filelist:
+            if (
+                zip_info.compress_type != zipfile.ZIP_STORED
+                or zip_info.is_dir()
+                or zip_info.filename.endswith((".py", ".pyc"))
+            ):
+                continue
+            # the local extra field may differ from the central directory's copy
+            self.fd.seek(zip_info.header_offset)
+            fields = struct.unpack(LOCAL_HEADER_FORMAT, self.fd.read(LOCAL_HEADER_SIZE))
+            data_offset = zip_info.header_offset + LOCAL_HEADER_SIZE + fields[10] + fields[11]
+            entries[zip_info.filename] = [zip_info.header_offset, data_offset, zip_info.file_size]
+        self.write_file(RESOURCE_INDEX, json.dumps(entries, sort_keys=True, separators=(",", ":")))
+
     def close(self):
         self.zf.close()
         self.fd.close()
+        if self.previous is not None:
+            self.previous.close()
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+        if exc_type is not None and not self.in_place:
+            os.remove(self.path)
 
 
 class PythonZipappBuilder(BuilderInterface):
     PLUGIN_NAME = "pyz"
 
     config: PyzConfig
+    # path of the dependency layer written by the last layered build
+    dependency_layer: str | None = None
 
     @classmethod
     def get_config_class(cls) -> type[BuilderConfig]:
@@ -142,48 +558,543 @@ class PythonZipappBuilder(BuilderInterface):
 
     def clean(self, directory: str, versions: Iterable[str]) -> None:  # noqa: ARG002
         for filename in os.listdir(directory):
-            if filename.endswith(".pyz"):
+            if filename.endswith(
+                (".pyz", f".pyz{MANIFEST_SUFFIX}", f".pyz{REPORT_SUFFIX}", f".pyz{FINGERPRINT_SUFFIX}")
+            ):
                 os.remove(os.path.join(directory, filename))
 
     @contextmanager
-    def bundle_dependencies(self, dependencies: Sequence[str]) -> Iterator[None]:
+    def bundle_dependencies(
+        self, dependencies: Sequence[str], report: BuildReport | None = None
+    ) -> Iterator[Iterable[IncludedFile]]:
+        """
+        Install the dependencies on a background thread and yield their files. The installation directory is scanned
+        lazily, in sorted order, as the files are consumed, so the whole tree is only held in memory when tree shaking
+        needs it.
+        """
         if not dependencies:
-            yield
+            yield ()
+            return
+
+        report = report or BuildReport()
+        with run_in_background(
+            lambda background_report: self.install_dependencies(dependencies, background_report), report
+        ) as wait:
+            yield self.scan_dependencies(wait, report)
+
+    @property
+    def records_distributions(self) -> bool:
+        """
+        Whether to record the distribution that installed each dependency file, which is only needed for the build
+        report and to tree-shake, so that the files are streamed otherwise.
+        """
+        return self.config.report or self.config.tree_shake
+
+    def scan_dependencies(self, get_target_directory: Callable[[], str], report: BuildReport) -> Iterator[IncludedFile]:
+        """
+        Lazily yield the files of the installed dependencies, only waiting for the installation when the first one is
+        needed.
+        """
+        target_directory = get_target_directory()
+        if self.records_distributions:
+            with report.phase("scan-dependencies"):
+                for name in sorted(os.listdir(target_directory)):
+                    record = os.path.join(target_directory, name, "RECORD")
+                    if name.endswith(".dist-info") and os.path.isfile(record):
+                        report.distributions.update(read_record(record))
+
+        files: Iterable[tuple[str, os.stat_result]] = scan_tree(target_directory)
+        if self.config.tree_shake:
+            with report.phase("prune-dependencies"):
+                scanned = dict(files)
+                selected = self.prune_dependencies(
+                    {file: file_stat.st_size for file, file_stat in scanned.items()},
+                    lambda file: Path(target_directory, file).read_bytes(),
+                    report,
+                )
+                files = [(file, scanned[file]) for file in selected]
+        elif self.config.dependency_exclude:
+            files = self.exclude_dependencies(files, report)
+
+        for file, file_stat in files:
+            distribution_path = self.config.get_distribution_path(file)
+            yield ScannedFile(os.path.join(target_directory, file), "", distribution_path, file_stat)
+
+    def exclude_dependencies(
+        self, files: Iterable[tuple[str, os.stat_result]], report: BuildReport
+    ) -> Iterator[tuple[str, os.stat_result]]:
+        """
+        Lazily drop the dependency files matching `dependency-exclude`, recording them in the report.
+        """
+        pruner = DependencyPruner(exclude=self.config.dependency_exclude)
+        for file, file_stat in files:
+            if pruner.is_excluded(file):
+                report.add_pruned(file, file_stat.st_size)
+            else:
+                yield file, file_stat
+
+    def prune_dependencies(
+        self, files: dict[str, int], read: Callable[[str], bytes], report: BuildReport
+    ) -> list[str]:
+        """
+        Drop the dependency files, given with their size, that match `dependency-exclude` and, with `tree-shake`, those
+        the project cannot import, recording what was left out in the report.
+        """
+        roots = []
+        for included_file in self.recurse_included_files():
+            distribution_path = included_file.distribution_path.replace(os.sep, "/")
+            module = get_module_name(distribution_path)
+            if module is not None and distribution_path.endswith(".py"):
+                roots.append((included_file.path, *module))
+
+        pruner = DependencyPruner(
+            exclude=self.config.dependency_exclude,
+            tree_shake=self.config.tree_shake,
+            keep=self.config.tree_shake_keep,
+        )
+        selected, pruned = pruner.select(
+            read, list(files), report.distributions, roots, imports=[self.config.main.split(":")[0]]
+        )
+        for file in pruned:
+            report.add_pruned(file, files[file])
+
+        return selected
+
+    @contextmanager
+    def collect_wheels(self, dependencies: Sequence[str], report: BuildReport | None = None) -> Iterator[list[str]]:
+        """
+        Yield the paths of a wheel for every dependency. Locked packages are used straight from the wheelhouse.
+        """
+        report = report or BuildReport()
+        lock = self.get_lock(dependencies, report)
+        if lock is not None:
+            for package in lock.packages:
+                if not package.filename.endswith(".whl"):
+                    message = f"Option `stream-wheels` requires wheels, but `{package.filename}` is locked"
+                    raise ValueError(message)
+            yield [os.path.join(self.config.wheelhouse, package.filename) for package in lock.packages]
+            return
+
+        with self.install_dependencies(dependencies, report, wheels=True) as wheel_directory:
+            yield [os.path.join(wheel_directory, filename) for filename in os.listdir(wheel_directory)]
+
+    def add_wheels(
+        self,
+        pyzapp: ZipappArchive,
+        wheels: Iterable[str],
+        report: BuildReport,
+        bytecode_compiler: BytecodeCompiler | None = None,
+    ) -> None:
+        """
+        Copy the members of every dependency wheel into the archive at the paths pip would install them to, without
+        unpacking them to disk.
+        """
+        with WheelArchives(path for path in wheels if path.endswith(".whl")) as wheel_archives:
+            members: Iterable[WheelMember] = report.timed("scan-dependencies", wheel_archives.members())
+            if self.config.dependency_exclude or self.config.tree_shake:
+                scanned = {member.arcname: member for member in members}
+                if self.records_distributions:
+                    report.distributions.update({arcname: member.distribution for arcname, member in scanned.items()})
+                with report.phase("prune-dependencies"):
+                    selected = self.prune_dependencies(
+                        {arcname: member.zip_info.file_size for arcname, member in scanned.items()},
+                        lambda arcname: scanned[arcname].wheel.read(scanned[arcname].zip_info),
+                        report,
+                    )
+                members = [scanned[arcname] for arcname in selected]
+
+            for member in members:
+                arcname = member.arcname
+                if self.records_distributions:
+                    report.distributions[arcname] = member.distribution
+                cfile = None
+                if bytecode_compiler is not None and arcname.endswith(".py"):
+                    with report.phase("compile-bytecode"):
+                        try:
+                            cfile = bytecode_compiler.compile_data(member.wheel.read(member.zip_info), arcname)
+                        except py_compile.PyCompileError:
+                            pass
+
+                if cfile is None or not self.config.sourceless:
+                    pyzapp.copy_entry(member.wheel, member.zip_info, arcname)
+                if cfile is not None:
+                    pyzapp.add_file(IncludedFile(cfile, "", f"{arcname}c"))
+
+    def get_lock(self, dependencies: Sequence[str], report: BuildReport) -> LockFile | None:
+        """
+        Read the configured lock file and make sure every locked package is in the wheelhouse, downloading the missing
+        ones in parallel.
+        """
+        lock_file = self.config.lock_file
+        if lock_file is None:
+            return None
+
+        if not os.path.isfile(lock_file):
+            message = f"Lock file `{lock_file}` does not exist; create it with `hatch-pyz lock`"
+            raise FileNotFoundError(message)
+        lock = LockFile.read(lock_file)
+        if not lock.is_current(dependencies):
+            message = f"Lock file `{lock_file}` is out of date with the project dependencies; run `hatch-pyz lock`"
+            raise ValueError(message)
+
+        with report.phase("fetch-dependencies"):
+            fetched = fetch(lock.packages, self.config.wheelhouse)
+        if fetched:
+            self.app.display_info(f"Fetched {fetched} locked packages into the wheelhouse")
+        return lock
+
+    @contextmanager
+    def install_dependencies(
+        self, dependencies: Sequence[str], report: BuildReport | None = None, *, wheels: bool = False
+    ) -> Iterator[str]:
+        """
+        Yield a directory containing the installed dependencies, or their wheels with `wheels`, reusing a cached
+        directory when one is available.
+
+        The cache can be controlled per build through the `HATCH_PYZ_DEPENDENCY_CACHE` environment variable: `bypass`
+        installs into a temporary directory without reading or writing the cache, and `prune` removes every cache
+        entry other than the one used by this build.
+        """
+        cache_mode = os.environ.get(CACHE_ENV_VAR, "").lower()
+        if cache_mode not in {"", "bypass", "prune"}:
+            message = f"Environment variable `{CACHE_ENV_VAR}` must be one of `bypass` or `prune`"
+            raise ValueError(message)
+
+        report = report or BuildReport()
+        install: Callable[[Sequence[str], str], None] = pip_wheel if wheels else pip_install
+        key_extra = ["wheels"] if wheels else []
+        lock = self.get_lock(dependencies, report)
+        if lock is not None:
+            locked_packages = lock.packages
+            wheelhouse = self.config.wheelhouse
+
+            def install_locked(_: Sequence[str], directory: str) -> None:
+                pip_install_locked(locked_packages, wheelhouse, directory)
+
+            install = install_locked
+            key_extra.append(lock.get_key())
+
+        if not self.config.dependency_cache or cache_mode == "bypass":
+            with tempfile.TemporaryDirectory() as target_directory:
+                with report.phase("install-dependencies"):
+                    install(dependencies, target_directory)
+                yield target_directory
             return
 
-        with tempfile.TemporaryDirectory() as target_directory:
-            pip_install(dependencies, target_directory)
+        with report.phase("install-dependencies"):
+            cache = DependencyCache(self.config.dependency_cache_dir, self.config.dependency_cache_max_size)
+            key = cache.get_key(dependencies, *key_extra)
+            cached_directory = cache.get(key)
+            if cached_directory is None:
+                self.app.display_waiting("Installing dependencies into the cache")
+                cached_directory = cache.add(key, lambda directory: install(dependencies, directory))
+            else:
+                self.app.display_info("Using cached dependencies")
 
-            for r, dirs, files in os.walk(target_directory):
-                root = Path(r)
-                dirs[:] = sorted(dirs)
-                files.sort()
-                for file in files:
-                    self.config.force_include[str(root / file)] = str(root.relative_to(target_directory) / file)
+            if cache_mode == "prune":
+                cache.prune(keep=key)
 
-            yield
+        yield cached_directory
 
     def build_standard(self, directory: str, **build_data: dict[str, Any]) -> str:  # noqa: ARG002
         project_name = self.normalize_file_name_component(self.metadata.core.raw_name)
-        target = Path(directory, f"{project_name}-{self.metadata.version}.pyz")
+        target = os.path.join(directory, f"{project_name}-{self.metadata.version}.pyz")
+        if not self.config.skip_unchanged:
+            if self.config.matrix:
+                return self.build_matrix(target)
+            return self.build_artifact(target)
 
-        module, function = self.config.main.split(":")
-        bundled_dependencies = (
-            self.bundle_dependencies(self.metadata.core.dependencies)
-            if self.config.bundle_depenencies
-            else nullcontext()
+        # the files are only stat-ed once, for both the fingerprint and the archive
+        project_files = [scan_file(included_file) for included_file in self.recurse_included_files()]
+        artifacts = [target, *(self.get_variant_target(target, variant["name"]) for variant in self.config.matrix)]
+        fingerprint_path = get_fingerprint_path(target)
+        previous = Fingerprint.load(fingerprint_path)
+        fingerprint = Fingerprint.compute(
+            project_files, self.get_fingerprint_options(), previous[0] if previous is not None else None
         )
+        if (
+            previous is not None
+            and previous[0].digest == fingerprint.digest
+            # the recorded artifacts include any dependency layer
+            and previous[1] == get_artifact_stats([os.path.join(directory, name) for name in previous[1]])
+        ):
+            self.app.display_info(f"{os.path.basename(target)} is up to date")
+            return target
+
+        if os.path.exists(fingerprint_path):
+            os.remove(fingerprint_path)
+        if self.config.matrix:
+            self.build_matrix(target, project_files)
+        else:
+            self.build_artifact(target, project_files=project_files)
+        if self.dependency_layer is not None:
+            artifacts.append(self.dependency_layer)
+
+        artifact_stats = get_artifact_stats(artifacts)
+        if artifact_stats is not None:
+            fingerprint.write(fingerprint_path, artifact_stats)
+        return target
+
+    def get_fingerprint_options(self) -> dict[str, Any]:
+        """
+        Everything besides the included files that the artifacts are built from.
+        """
+        lock_file = self.config.lock_file
+        return {
+            "plugin": get_plugin_version(),
+            "python": sys.implementation.cache_tag,
+            "name": self.metadata.core.name,
+            "version": self.metadata.version,
+            "build": {key: value for key, value in self.build_config.items() if key != "targets"},
+            "target": self.target_config,
+            "dependencies": self.metadata.core.dependencies,
+            "lock": file_digest(lock_file) if lock_file and os.path.isfile(lock_file) else None,
+            "source_date_epoch": get_reproducible_timestamp() if self.config.reproducible else None,
+        }
+
+    def get_variant_target(self, target: str, name: str) -> str:
+        return f"{target[: -len('.pyz')]}-{name}.pyz"
 
-        with ZipappArchive(
+    def get_variant_config(self, overrides: dict[str, Any]) -> dict[str, Any]:
+        """
+        Return the project configuration of a matrix variant: this target's options updated with `overrides`.
+        """
+        config = copy.deepcopy(self.metadata.config)
+        build_config = config.setdefault("tool", {}).setdefault("hatch", {}).setdefault("build", {})
+        build_config.pop("matrix", None)
+        target_config = build_config.setdefault("targets", {}).setdefault(self.PLUGIN_NAME, {})
+        target_config.pop("matrix", None)
+        target_config.update(overrides)
+        return config
+
+    def build_matrix(self, target: str, project_files: Sequence[IncludedFile] | None = None) -> str:
+        """
+        Build the artifact along with every variant of the `matrix` option, named `<name>-<version>-<variant>.pyz`.
+        Files are selected and dependencies installed once, then the archives are written concurrently by a process
+        pool, each exactly as a standalone build with the variant's options would write it.
+        """
+        if project_files is None:
+            project_files = list(self.recurse_included_files())
+
+        builds = [(target, self.get_variant_config({}), self.config.bundle_depenencies)]
+        for variant in self.config.matrix:
+            overrides = {key: value for key, value in variant.items() if key != "name"}
+            variant_target = self.get_variant_target(target, variant["name"])
+            bundled = overrides.get("bundle-dependencies", self.config.bundle_depenencies)
+            builds.append((variant_target, self.get_variant_config(overrides), bundled))
+
+        dependencies = self.metadata.core.dependencies if any(bundled for _, _, bundled in builds) else []
+        with self.bundle_dependencies(dependencies) as dependency_files:
+            all_files = [*project_files, *dependency_files]
+            with ProcessPoolExecutor(max_workers=min(len(builds), os.cpu_count() or 1)) as executor:
+                futures = [
+                    executor.submit(
+                        build_variant, self.root, config, variant_target, all_files if bundled else project_files
+                    )
+                    for variant_target, config, bundled in builds
+                ]
+                artifacts = [future.result() for future in futures]
+
+        for artifact in artifacts[1:]:
+            self.app.display_info(f"Built variant {os.path.basename(artifact)}")
+        return artifacts[0]
+
+    def get_archive(
+        self,
+        *,
+        executable: bool = True,
+        record_manifest: bool = False,
+        previous: PreviousArchive | None = None,
+        report: BuildReport | None = None,
+        existing: str | None = None,
+    ) -> ZipappArchive:
+        """
+        Open an archive written with this target's options, with a shebang line if it is `executable`, or the
+        `existing` archive to update it in place.
+        """
+        return ZipappArchive(
             reproducible=self.config.reproducible,
             compressed=self.config.compressed,
-            interpreter=self.config.interpreter,
-        ) as pyzapp, bundled_dependencies:
-            pyzapp.write_dunder_main(module, function)
-            for included_file in self.recurse_included_files():
-                pyzapp.add_file(included_file)
+            interpreter=get_shebang(self.config.interpreter, self.config.interpreter_flags) if executable else None,
+            jobs=self.config.jobs,
+            record_manifest=record_manifest,
+            previous=previous,
+            compression_policy=self.config.compression_policy,
+            report=report if self.config.report else None,
+            existing=existing,
+        )
+
+    def add_selected_files(
+        self,
+        pyzapp: ZipappArchive,
+        included_files: Iterable[IncludedFile],
+        report: BuildReport,
+        bytecode_compiler: BytecodeCompiler | None = None,
+    ) -> None:
+        selected_files: Iterable[IncludedFile] = report.timed("select-files", included_files)
+        if bytecode_compiler is not None:
+            selected_files = report.timed(
+                "compile-bytecode",
+                bytecode_compiler.add_bytecode(selected_files, sourceless=self.config.sourceless),
+            )
+        pyzapp.add_files(selected_files)
+
+    def build_artifact(
+        self,
+        target: str,
+        included_files: Iterable[IncludedFile] | None = None,
+        *,
+        project_files: Iterable[IncludedFile] | None = None,
+    ) -> str:
+        """
+        Build the archive at `target`. Files are selected and dependencies installed unless `included_files` is given,
+        as it is for the variants of a matrix build; `project_files` replaces only the selection of project files.
+        """
+        report = BuildReport()
+        report.project_name = self.metadata.core.name
+
+        module, function = self.config.main.split(":")
+        dependencies = self.metadata.core.dependencies if self.config.bundle_depenencies else []
+        bundled_files: ContextManager[Iterable[IncludedFile]] = nullcontext(())
+        bundled_wheels: ContextManager[Callable[[], list[str]] | None] = nullcontext()
+        # dependencies are installed while the project files are written, and only waited for once they are needed
+        if included_files is None and dependencies and self.config.stream_wheels:
+            bundled_wheels = run_in_background(
+                lambda background_report: self.collect_wheels(dependencies, background_report), report
+            )
+        elif included_files is None and dependencies:
+            bundled_files = self.bundle_dependencies(dependencies, report)
+
+        # any option that changes how unchanged files are written invalidates the previous artifact
+        manifest_options = {
+            "compression": self.config.compression_policy.to_dict(),
+            "reproducible": self.config.reproducible,
+            "source_date_epoch": get_reproducible_timestamp() if self.config.reproducible else None,
+        }
+        manifest_path = get_manifest_path(target)
+        previous = PreviousArchive.load(target, manifest_options) if self.config.incremental else None
+
+        bytecode_compiler = (
+            BytecodeCompiler(optimize=self.config.optimize, interpreter=self.config.bytecode_interpreter)
+            if self.config.compile_bytecode
+            else None
+        )
+
+        launcher = get_launcher_command(self.config.interpreter, self.config.interpreter_flags)
+        layered = included_files is None and bool(dependencies) and self.config.layered
+        # temporary path and final path of the dependency layer
+        layer_paths: tuple[str, str] | None = None
+
+        with report.phase("write-archive"), ExitStack() as stack:
+            pyzapp = stack.enter_context(
+                self.get_archive(record_manifest=self.config.incremental, previous=previous, report=report)
+            )
+            # opened within the same stack, so that both archives are closed and removed if the build fails
+            layer = stack.enter_context(self.get_archive(executable=False, report=report)) if layered else None
+            dependency_files = stack.enter_context(bundled_files)
+            wheels = stack.enter_context(bundled_wheels)
+            if bytecode_compiler is not None:
+                stack.enter_context(bytecode_compiler)
+
+            bootstrap: tuple[str, ...] = ()
+            if self.config.precompute_sys_path:
+                with report.phase("precompute-sys-path"):
+                    sys_path = get_sys_path(launcher)
+                # replaces the entries `site` would add, so that it can be skipped with `-S`
+                bootstrap += sys_path.get_bootstrap()
+
+            if self.config.import_profiling:
+                pyzapp.write_runtime_module("profile")
+                bootstrap += IMPORT_PROFILE_BOOTSTRAP
+
+            if self.config.lazy_imports:
+                pyzapp.write_runtime_module("lazy")
+                bootstrap += ("from _hatch_pyz.lazy import install as install_lazy_imports", "install_lazy_imports()")
+
+            # extracted resources are read from the extraction directory
+            resource_index = self.config.mapped_resources and not self.config.extract
+            if self.config.mapped_resources:
+                pyzapp.write_runtime_module("resources")
+
+            if self.config.extract:
+                pyzapp.write_runtime_module("extract")
+            elif layer is None:
+                pyzapp.write_dunder_main(module, function, bootstrap)
+
+            if included_files is None:
+                if project_files is None:
+                    project_files = self.recurse_included_files()
+                included_files = project_files if layer is not None else chain(project_files, dependency_files)
+            self.add_selected_files(pyzapp, included_files, report, bytecode_compiler)
+            if layer is not None:
+                self.add_selected_files(layer, dependency_files, report, bytecode_compiler)
+            if wheels is not None:
+                # only set when streaming wheels
+                self.add_wheels(layer or pyzapp, wheels(), report, bytecode_compiler)
+
+            if layer is not None:
+                if resource_index:
+                    layer.write_resource_index()
+                # the layer is named after its contents, so __main__ can only be written once it is complete
+                project_name = self.normalize_file_name_component(self.metadata.core.raw_name)
+                layer_name = f"{project_name}-deps-{layer.get_build_id()}.pyz"
+                layer_paths = (layer.path, os.path.join(os.path.dirname(target), layer_name))
+                self.dependency_layer = layer_paths[1]
+                pyzapp.write_runtime_module("layers")
+                bootstrap += (
+                    "import os.path",
+                    "from _hatch_pyz.layers import add_layer",
+                    f"add_layer(os.path.dirname(__file__), {layer_name!r})",
+                )
+                pyzapp.write_dunder_main(module, function, bootstrap)
+
+            if self.config.extract:
+                # the extraction directory is named after the contents, so __main__ can only be written last
+                bootstrap += (
+                    "import os.path",
+                    "from _hatch_pyz.extract import bootstrap",
+                    f"bootstrap(os.path.dirname(__file__), {pyzapp.get_build_id()!r})",
+                )
+                pyzapp.write_dunder_main(module, function, bootstrap)
+
+            # last, once the offsets of every entry are known
+            if resource_index:
+                pyzapp.write_resource_index()
+
+        with report.phase("replace-file"):
+            replace_file(pyzapp.path, target)
+            normalize_artifact_permissions(target)
+            if layer_paths is not None:
+                layer_path, layer_target = layer_paths
+                # an existing layer has the same contents, and keeping it keeps its timestamp for caches
+                if os.path.exists(layer_target):
+                    os.remove(layer_path)
+                else:
+                    replace_file(layer_path, layer_target)
+                    normalize_artifact_permissions(layer_target)
+                self.app.display_info(f"Dependency layer {os.path.basename(layer_target)}")
+
+        if pyzapp.manifest is not None:
+            write_manifest(manifest_path, manifest_options, pyzapp.manifest)
+        elif os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        report_path = get_report_path(target)
+        if self.config.report:
+            report.write(report_path)
+            self.app.display_info(report.get_summary())
+        elif os.path.exists(report_path):
+            os.remove(report_path)
+
+        if self.config.validate is not None:
+            validate_artifact(target, launcher, self.config.validate)
+            self.app.display_info(f"Validated {os.path.basename(target)}")
+
+        return target
 
-        replace_file(pyzapp.path, str(target))
-        normalize_artifact_permissions(str(target))
 
-        return os.fspath(target)
+def build_variant(root: str, config: dict[str, Any], target: str, included_files: Sequence[IncludedFile]) -> str:
+    """
+    Build one artifact of a matrix build in a worker process.
+    """
+    return PythonZipappBuilder(root, config=config).build_artifact(target, included_files)
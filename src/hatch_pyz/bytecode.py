@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+import py_compile
+import subprocess
+import tempfile
+from typing import TYPE_CHECKING
+
+from hatchling.builders.plugin.interface import IncludedFile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# Runs in the target interpreter: compiles one file per request line and answers with an empty line on success or
+# the error message otherwise
+COMPILE_SERVER = """\
+import json, py_compile, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    try:
+        py_compile.compile(
+            request["file"], request["cfile"], request["dfile"], doraise=True, optimize=request["optimize"],
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+    except Exception as e:
+        sys.stdout.write(json.dumps(str(e)) + "\\n")
+    else:
+        sys.stdout.write("\\n")
+    sys.stdout.flush()
+"""
+
+
+class BytecodeCompiler:
+    """
+    Compiles sources to unchecked hash-based `.pyc` files. Unlike timestamp-based pycs these are reproducible, and
+    zipimport loads them without comparing against the source, which it could not otherwise do cheaply.
+
+    Compilation happens in-process unless a target `interpreter` is given, in which case a single long-lived
+    subprocess of that interpreter does the work so the bytecode matches its magic number.
+    """
+
+    def __init__(self, *, optimize: int = 0, interpreter: str | None = None):
+        self.optimize = optimize
+        self.interpreter = interpreter
+        self.process: subprocess.Popen | None = None
+        self.temp_directory = tempfile.TemporaryDirectory()
+
+    def compile(self, source: str, distribution_path: str) -> str:
+        """
+        Compile `source` and return the path of the resulting `.pyc` file, raising `py_compile.PyCompileError` if
+        the source cannot be compiled.
+        """
+        cfile = os.path.join(self.temp_directory.name, f"{distribution_path}c")
+        os.makedirs(os.path.dirname(cfile), exist_ok=True)
+
+        if self.interpreter is None:
+            py_compile.compile(
+                source,
+                cfile,
+                distribution_path,
+                doraise=True,
+                optimize=self.optimize,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+            return cfile
+
+        if self.process is None:
+            self.process = subprocess.Popen(
+                [self.interpreter, "-c", COMPILE_SERVER],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+            )
+
+        request = {"file": source, "cfile": cfile, "dfile": distribution_path, "optimize": self.optimize}
+        assert self.process.stdin is not None
+        assert self.process.stdout is not None
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        response = self.process.stdout.readline()
+        if not response:
+            message = f"Bytecode compiler `{self.interpreter}` exited unexpectedly"
+            raise RuntimeError(message)
+        if response.strip():
+            raise py_compile.PyCompileError(SyntaxError, SyntaxError(json.loads(response)), source)
+
+        return cfile
+
+    def compile_data(self, data: bytes, distribution_path: str) -> str:
+        """
+        Compile a source that is not on disk, such as a member of a wheel.
+        """
+        source = os.path.join(self.temp_directory.name, "sources", distribution_path)
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+        with open(source, "wb") as f:
+            f.write(data)
+        return self.compile(source, distribution_path)
+
+    def add_bytecode(self, included_files: Iterable[IncludedFile], *, sourceless: bool) -> Iterator[IncludedFile]:
+        """
+        Follow every Python source with its compiled `.pyc`, dropping the source when `sourceless` is set. Sources
+        that fail to compile, such as Python 2 test fixtures shipped by some dependencies, are kept as they are.
+        """
+        for included_file in included_files:
+            distribution_path = included_file.distribution_path
+            if not distribution_path.endswith(".py") or distribution_path == "__main__.py":
+                yield included_file
+                continue
+
+            try:
+                cfile = self.compile(included_file.path, distribution_path)
+            except py_compile.PyCompileError:
+                yield included_file
+                continue
+
+            if not sourceless:
+                yield included_file
+            yield IncludedFile(cfile, "", f"{distribution_path}c")
+
+    def close(self) -> None:
+        if self.process is not None:
+            if self.process.stdin is not None:
+                self.process.stdin.close()
+            self.process.wait()
+            if self.process.stdout is not None:
+                self.process.stdout.close()
+        self.temp_directory.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
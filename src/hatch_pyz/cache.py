@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import sysconfig
+import tempfile
+from typing import TYPE_CHECKING, Callable
+
+from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+CACHE_ENV_VAR = "HATCH_PYZ_DEPENDENCY_CACHE"
+
+
+def default_cache_directory() -> str:
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "hatch-pyz", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/hatch-pyz")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "hatch-pyz")
+
+
+def normalize_requirements(dependencies: Iterable[str]) -> list[str]:
+    normalized = set()
+    for dependency in dependencies:
+        requirement = Requirement(dependency)
+        requirement.name = canonicalize_name(requirement.name)
+        normalized.add(str(requirement))
+    return sorted(normalized)
+
+
+class DependencyCache:
+    """
+    An on-disk cache of installed dependency trees, keyed by the requirement set and the interpreter and platform
+    they were installed for. Least recently used entries are evicted once the cache grows beyond `max_size` bytes.
+
+    Each entry is a directory named after its key, with a sibling `<key>.json` file recording its size. The
+    modification time of that file tracks when the entry was last used.
+    """
+
+    def __init__(self, directory: str, max_size: int | None = None):
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(dependencies: Iterable[str], *extra: str) -> str:
+        key_data = {
+            "dependencies": normalize_requirements(dependencies),
+            "implementation": sys.implementation.cache_tag,
+            "platform": sysconfig.get_platform(),
+            "extra": list(extra),
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> str | None:
+        path = self.entry_path(key)
+        metadata_path = f"{path}.json"
+        if not (os.path.isdir(path) and os.path.isfile(metadata_path)):
+            return None
+
+        # mark the entry as recently used
+        os.utime(metadata_path)
+        return path
+
+    def add(self, key: str, populate: Callable[[str], None]) -> str:
+        """
+        Populate a new entry through `populate`, which receives an empty directory to fill. The entry only becomes
+        visible once fully populated, so an interrupted or concurrent build never sees a partial tree.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.entry_path(key)
+
+        staging_directory = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            populate(staging_directory)
+            size = get_tree_size(staging_directory)
+            try:
+                os.rename(staging_directory, path)
+            except OSError:
+                # another build populated the same entry first
+                if not os.path.isdir(path):
+                    raise
+                shutil.rmtree(staging_directory)
+        except BaseException:
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            raise
+
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({"size": size}, f)
+
+        self.evict(keep=key)
+        return path
+
+    def entries(self) -> list[tuple[str, float, int]]:
+        """
+        Return `(key, last_used, size)` for every complete entry, least recently used first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            key = filename[: -len(".json")]
+            metadata_path = os.path.join(self.directory, filename)
+            try:
+                with open(metadata_path, encoding="utf-8") as f:
+                    size = json.load(f)["size"]
+                last_used = os.stat(metadata_path).st_mtime
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((key, last_used, size))
+
+        entries.sort(key=lambda entry: (entry[1], entry[0]))
+        return entries
+
+    def remove(self, key: str) -> None:
+        path = self.entry_path(key)
+        # drop the metadata first so a half-removed tree is never reported as an entry
+        try:
+            os.remove(f"{path}.json")
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(path, ignore_errors=True)
+
+    def evict(self, keep: str | None = None) -> None:
+        if self.max_size is None:
+            return
+
+        entries = self.entries()
+        total_size = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total_size <= self.max_size:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total_size -= size
+
+    def prune(self, keep: str | None = None) -> None:
+        for key, _, _ in self.entries():
+            if key != keep:
+                self.remove(key)
+
+
+def get_tree_size(directory: str) -> int:
+    size = 0
+    for root, _, files in os.walk(directory):
+        for file in files:
+            size += os.lstat(os.path.join(root, file)).st_size
+    return size
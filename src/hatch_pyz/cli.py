@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import TYPE_CHECKING
+
+from hatch_pyz.analyze import ArchiveAnalysis, diff_archives, format_diff
+from hatch_pyz.builder import PythonZipappBuilder
+from hatch_pyz.lock import LockFile, fetch, resolve
+from hatch_pyz.watch import DEFAULT_COMPACT_THRESHOLD, DEFAULT_INTERVAL, Watcher
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+DEFAULT_LOCK_FILE = "pyz.lock"
+DEFAULT_TOP = 20
+
+
+def get_lock_file(builder: PythonZipappBuilder, path: str | None) -> str:
+    if path is not None:
+        return os.path.abspath(path)
+    return builder.config.lock_file or os.path.join(builder.root, DEFAULT_LOCK_FILE)
+
+
+def lock(args: argparse.Namespace) -> int:
+    builder = PythonZipappBuilder(os.path.abspath(args.root))
+    lock_file = get_lock_file(builder, args.lock_file)
+    locked = resolve(builder.metadata.core.dependencies)
+    locked.write(lock_file)
+    print(f"Locked {len(locked.packages)} packages in {lock_file}")
+    return 0
+
+
+def fetch_locked(args: argparse.Namespace) -> int:
+    builder = PythonZipappBuilder(os.path.abspath(args.root))
+    lock_file = get_lock_file(builder, args.lock_file)
+    locked = LockFile.read(lock_file)
+    fetched = fetch(locked.packages, builder.config.wheelhouse)
+    print(f"Fetched {fetched} of {len(locked.packages)} locked packages into {builder.config.wheelhouse}")
+    return 0
+
+
+def inspect_artifact(args: argparse.Namespace) -> int:
+    analysis = ArchiveAnalysis(args.artifact)
+    print(json.dumps(analysis.to_dict(), indent=2) if args.json else analysis.get_summary(args.top))
+    return 0
+
+
+def diff_artifacts(args: argparse.Namespace) -> int:
+    diff = diff_archives(ArchiveAnalysis(args.old), ArchiveAnalysis(args.new))
+    print(json.dumps(diff, indent=2) if args.json else format_diff(diff, args.top))
+    return 0
+
+
+def watch(args: argparse.Namespace) -> int:
+    root = os.path.abspath(args.root)
+    builder = PythonZipappBuilder(root)
+    directory = os.path.abspath(args.directory) if args.directory else builder.config.directory
+    os.makedirs(directory, exist_ok=True)
+    watcher = Watcher(lambda: PythonZipappBuilder(root), directory, compact_threshold=args.compact_threshold)
+    watcher.run(args.interval)
+    return 0
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--json", action="store_true", help="Print every row as JSON instead of tables")
+    parser.add_argument(
+        "--top", type=int, default=DEFAULT_TOP, help=f"Rows to show in each table (default: {DEFAULT_TOP})"
+    )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="hatch-pyz", description="Tools for hatch-pyz projects")
+    parser.add_argument("--root", default=os.curdir, help="Project root directory (default: current directory)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    lock_parser = subparsers.add_parser("lock", help="Resolve the project dependencies into a lock file")
+    lock_parser.add_argument(
+        "--lock-file", help=f"Lock file to write (default: the `lock-file` option or {DEFAULT_LOCK_FILE})"
+    )
+    lock_parser.set_defaults(func=lock)
+
+    fetch_parser = subparsers.add_parser("fetch", help="Download the locked packages into the wheelhouse")
+    fetch_parser.add_argument(
+        "--lock-file", help=f"Lock file to read (default: the `lock-file` option or {DEFAULT_LOCK_FILE})"
+    )
+    fetch_parser.set_defaults(func=fetch_locked)
+
+    inspect_parser = subparsers.add_parser("inspect", help="Show what makes up the size of a built artifact")
+    inspect_parser.add_argument("artifact", help="Path to a .pyz artifact")
+    add_output_arguments(inspect_parser)
+    inspect_parser.set_defaults(func=inspect_artifact)
+
+    diff_parser = subparsers.add_parser("diff", help="Compare the contents of two built artifacts")
+    diff_parser.add_argument("old", help="Path to the earlier .pyz artifact")
+    diff_parser.add_argument("new", help="Path to the later .pyz artifact")
+    add_output_arguments(diff_parser)
+    diff_parser.set_defaults(func=diff_artifacts)
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Build the artifact, then update it in place whenever project files change"
+    )
+    watch_parser.add_argument("--directory", help="Output directory (default: the target's build directory)")
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between checks for changes (default: {DEFAULT_INTERVAL})",
+    )
+    watch_parser.add_argument(
+        "--compact-threshold",
+        type=float,
+        default=DEFAULT_COMPACT_THRESHOLD,
+        help="Fraction of the archive left unused by replaced entries that triggers a full rebuild "
+        f"(default: {DEFAULT_COMPACT_THRESHOLD})",
+    )
+    watch_parser.set_defaults(func=watch)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import zipfile
+import zlib
+from fnmatch import fnmatchcase
+from typing import IO, Any, NamedTuple, Sequence
+
+CHUNK_SIZE = 16384
+
+COMPRESSION_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+# Only these can be read by zipimport, and so by the zipapp's imports and `importlib.resources`
+ZIPIMPORT_METHODS = {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+COMPRESSION_LEVELS = {
+    zipfile.ZIP_DEFLATED: range(10),
+    zipfile.ZIP_BZIP2: range(1, 10),
+}
+
+
+class CompressionRule(NamedTuple):
+    pattern: str
+    method: int
+    level: int | None = None
+
+
+class CompressionPolicy:
+    """
+    Chooses the compression method and level of each entry from its archive path. Rules are glob patterns matched in
+    order, the first match winning; unmatched entries use the default method and level.
+
+    When `min_savings` is set, compressed entries that shrink by less than that fraction of their size are stored
+    instead, which avoids paying decompression costs at runtime for data that is already compressed.
+    """
+
+    def __init__(
+        self,
+        method: int,
+        level: int | None = None,
+        rules: Sequence[CompressionRule] = (),
+        min_savings: float = 0.0,
+    ):
+        self.method = method
+        self.level = level
+        self.rules = rules
+        self.min_savings = min_savings
+
+    def get(self, arcname: str) -> tuple[int, int | None]:
+        for rule in self.rules:
+            if fnmatchcase(arcname, rule.pattern):
+                return rule.method, rule.level
+        return self.method, self.level
+
+    def is_worthwhile(self, compressed: CompressedData) -> bool:
+        return len(compressed.data) <= compressed.file_size * (1 - self.min_savings)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "level": self.level,
+            "rules": [list(rule) for rule in self.rules],
+            "min_savings": self.min_savings,
+        }
+
+
+def get_compresslevel(zip_info: zipfile.ZipInfo) -> int | None:
+    # renamed to `compress_level` in Python 3.13, which keeps `_compresslevel` as an alias
+    return zip_info._compresslevel  # type: ignore[attr-defined]
+
+
+def set_compresslevel(zip_info: zipfile.ZipInfo, compresslevel: int | None) -> None:
+    zip_info._compresslevel = compresslevel  # type: ignore[attr-defined]
+
+
+class CompressedData(NamedTuple):
+    data: bytes
+    crc: int
+    file_size: int
+    digest: str | None = None
+
+
+def compress_file(
+    path: str, compress_type: int, compresslevel: int | None = None, *, digest: bool = False
+) -> CompressedData:
+    """
+    Read and compress a file entirely in memory, producing the same stream `ZipFile.open(..., "w")` would write.
+    With `digest`, the SHA-256 of the uncompressed content is computed in the same pass.
+    """
+    with open(path, "rb") as in_file:
+        return compress_stream(in_file, compress_type, compresslevel, digest=digest)
+
+
+def compress_stream(
+    in_file: IO[bytes], compress_type: int, compresslevel: int | None = None, *, digest: bool = False
+) -> CompressedData:
+    """
+    Like `compress_file`, for an open binary file such as a member of another archive.
+    """
+    compressor = zipfile._get_compressor(compress_type, compresslevel)  # type: ignore[attr-defined]
+    hasher = hashlib.sha256() if digest else None
+    crc = 0
+    file_size = 0
+    parts = []
+    while True:
+        chunk = in_file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        file_size += len(chunk)
+        crc = zlib.crc32(chunk, crc)
+        if hasher:
+            hasher.update(chunk)
+        parts.append(compressor.compress(chunk) if compressor else chunk)
+    if compressor:
+        parts.append(compressor.flush())
+    return CompressedData(b"".join(parts), crc, file_size, hasher.hexdigest() if hasher else None)
@@ -3,11 +3,49 @@ from __future__ import annotations
 import os
 import re
 import sys
+import zipfile
 from functools import cached_property
-from typing import NamedTuple
+from typing import Any, NamedTuple
 
 from hatchling.builders.config import BuilderConfig
 
+from hatch_pyz.cache import default_cache_directory
+from hatch_pyz.compression import (
+    COMPRESSION_LEVELS,
+    COMPRESSION_METHODS,
+    ZIPIMPORT_METHODS,
+    CompressionPolicy,
+    CompressionRule,
+)
+from hatch_pyz.launcher import is_env
+
+# options that only affect how the archive is written, and so may differ between the variants of a matrix build
+VARIANT_OPTIONS = {
+    "interpreter",
+    "interpreter-flags",
+    "precompute-sys-path",
+    "lazy-imports",
+    "validate",
+    "mapped-resources",
+    "main",
+    "reproducible",
+    "compressed",
+    "compression-level",
+    "compression-rules",
+    "min-compression-savings",
+    "bundle-dependencies",
+    "jobs",
+    "extract",
+    "import-profiling",
+    "compile-bytecode",
+    "optimize",
+    "sourceless",
+    "bytecode-interpreter",
+    "report",
+    "incremental",
+}
+VARIANT_NAME_PATTERN = re.compile(r"[A-Za-z0-9_.]+")
+
 
 class FileSelectionOptions(NamedTuple):
     include: list[str]
@@ -129,6 +167,113 @@ class PyzConfig(BuilderConfig):
 
         return compressed
 
+    @cached_property
+    def compression_level(self) -> int | None:
+        if "compression-level" in self.target_config:
+            compression_level = self.target_config["compression-level"]
+            if not isinstance(compression_level, int) or isinstance(compression_level, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.compression-level` must be an integer"
+                raise TypeError(message)
+        else:
+            compression_level = self.build_config.get("compression-level", None)
+            if compression_level is not None and (
+                not isinstance(compression_level, int) or isinstance(compression_level, bool)
+            ):
+                message = "Field `tool.hatch.build.compression-level` must be an integer"
+                raise TypeError(message)
+
+        if compression_level is not None and compression_level not in COMPRESSION_LEVELS[zipfile.ZIP_DEFLATED]:
+            message = "Field `compression-level` must be between 0 and 9"
+            raise ValueError(message)
+
+        return compression_level
+
+    @cached_property
+    def compression_rules(self) -> list[CompressionRule]:
+        if "compression-rules" in self.target_config:
+            raw_rules = self.target_config["compression-rules"]
+            if not isinstance(raw_rules, list):
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.compression-rules` must be an array of tables"
+                )
+                raise TypeError(message)
+        else:
+            raw_rules = self.build_config.get("compression-rules", [])
+            if not isinstance(raw_rules, list):
+                message = "Field `tool.hatch.build.compression-rules` must be an array of tables"
+                raise TypeError(message)
+
+        rules = []
+        for i, raw_rule in enumerate(raw_rules, 1):
+            if not isinstance(raw_rule, dict):
+                message = f"Rule #{i} of field `compression-rules` must be a table"
+                raise TypeError(message)
+
+            pattern = raw_rule.get("pattern")
+            if not isinstance(pattern, str) or not pattern:
+                message = f"Option `pattern` in rule #{i} of field `compression-rules` must be a non-empty string"
+                raise TypeError(message)
+
+            method_name = raw_rule.get("method", "deflated" if self.compressed else "stored")
+            if method_name not in COMPRESSION_METHODS:
+                methods = ", ".join(f"`{name}`" for name in COMPRESSION_METHODS)
+                message = f"Option `method` in rule #{i} of field `compression-rules` must be one of {methods}"
+                raise ValueError(message)
+            method = COMPRESSION_METHODS[method_name]
+
+            level = raw_rule.get("level")
+            if level is not None:
+                if method not in COMPRESSION_LEVELS:
+                    message = (
+                        f"Option `level` in rule #{i} of field `compression-rules` is not supported by `{method_name}`"
+                    )
+                    raise ValueError(message)
+                if isinstance(level, bool) or level not in COMPRESSION_LEVELS[method]:
+                    valid = COMPRESSION_LEVELS[method]
+                    message = (
+                        f"Option `level` in rule #{i} of field `compression-rules` must be an integer between "
+                        f"{valid[0]} and {valid[-1]} for `{method_name}`"
+                    )
+                    raise ValueError(message)
+
+            if method not in ZIPIMPORT_METHODS and not self.extract:
+                message = (
+                    f"Method `{method_name}` in rule #{i} of field `compression-rules` cannot be read by zipimport and "
+                    f"requires `extract` to be enabled"
+                )
+                raise ValueError(message)
+
+            rules.append(CompressionRule(pattern, method, level))
+
+        return rules
+
+    @cached_property
+    def min_compression_savings(self) -> float:
+        if "min-compression-savings" in self.target_config:
+            min_savings = self.target_config["min-compression-savings"]
+            if not isinstance(min_savings, (int, float)) or isinstance(min_savings, bool) or not 0 <= min_savings < 1:
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.min-compression-savings` "
+                    f"must be a number between 0 and 1"
+                )
+                raise TypeError(message)
+        else:
+            min_savings = self.build_config.get("min-compression-savings", 0.0)
+            if not isinstance(min_savings, (int, float)) or isinstance(min_savings, bool) or not 0 <= min_savings < 1:
+                message = "Field `tool.hatch.build.min-compression-savings` must be a number between 0 and 1"
+                raise TypeError(message)
+
+        return float(min_savings)
+
+    @cached_property
+    def compression_policy(self) -> CompressionPolicy:
+        return CompressionPolicy(
+            zipfile.ZIP_DEFLATED if self.compressed else zipfile.ZIP_STORED,
+            self.compression_level if self.compressed else None,
+            self.compression_rules,
+            self.min_compression_savings,
+        )
+
     @cached_property
     def bundle_depenencies(self) -> bool:
         if "bundle-dependencies" in self.target_config:
@@ -144,6 +289,478 @@ class PyzConfig(BuilderConfig):
 
         return bundle_depenencies
 
+    @cached_property
+    def stream_wheels(self) -> bool:
+        if "stream-wheels" in self.target_config:
+            stream_wheels = self.target_config["stream-wheels"]
+            if not isinstance(stream_wheels, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.stream-wheels` must be a boolean"
+                raise TypeError(message)
+        else:
+            stream_wheels = self.build_config.get("stream-wheels", False)
+            if not isinstance(stream_wheels, bool):
+                message = "Field `tool.hatch.build.stream-wheels` must be a boolean"
+                raise TypeError(message)
+
+        return stream_wheels
+
+    @cached_property
+    def layered(self) -> bool:
+        if "layered" in self.target_config:
+            layered = self.target_config["layered"]
+            if not isinstance(layered, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.layered` must be a boolean"
+                raise TypeError(message)
+        else:
+            layered = self.build_config.get("layered", False)
+            if not isinstance(layered, bool):
+                message = "Field `tool.hatch.build.layered` must be a boolean"
+                raise TypeError(message)
+
+        if layered and self.extract:
+            message = "Field `layered` cannot be combined with `extract`"
+            raise ValueError(message)
+
+        return layered
+
+    @cached_property
+    def matrix(self) -> list[dict[str, Any]]:
+        if "matrix" in self.target_config:
+            variants = self.target_config["matrix"]
+            if not isinstance(variants, list):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.matrix` must be an array of tables"
+                raise TypeError(message)
+        else:
+            variants = self.build_config.get("matrix", [])
+            if not isinstance(variants, list):
+                message = "Field `tool.hatch.build.matrix` must be an array of tables"
+                raise TypeError(message)
+
+        names = set()
+        for i, variant in enumerate(variants, 1):
+            if not isinstance(variant, dict):
+                message = f"Variant #{i} of field `matrix` must be a table"
+                raise TypeError(message)
+
+            name = variant.get("name")
+            if not isinstance(name, str) or not VARIANT_NAME_PATTERN.fullmatch(name):
+                message = (
+                    f"Option `name` in variant #{i} of field `matrix` must be a non-empty string of letters, digits, "
+                    f"underscores and periods"
+                )
+                raise TypeError(message)
+            if name in names:
+                message = f"Variant name `{name}` of field `matrix` is not unique"
+                raise ValueError(message)
+            names.add(name)
+
+            unsupported = sorted(set(variant) - VARIANT_OPTIONS - {"name"})
+            if unsupported:
+                options = ", ".join(f"`{option}`" for option in unsupported)
+                message = f"Variant `{name}` of field `matrix` sets options that cannot vary by variant: {options}"
+                raise ValueError(message)
+
+        if variants and self.stream_wheels:
+            message = "Field `matrix` cannot be combined with `stream-wheels`"
+            raise ValueError(message)
+        if variants and self.layered:
+            message = "Field `matrix` cannot be combined with `layered`"
+            raise ValueError(message)
+
+        return variants
+
+    @cached_property
+    def jobs(self) -> int:
+        if "jobs" in self.target_config:
+            jobs = self.target_config["jobs"]
+            if not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 0:
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.jobs` must be a non-negative integer"
+                raise TypeError(message)
+        else:
+            jobs = self.build_config.get("jobs", 1)
+            if not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 0:
+                message = "Field `tool.hatch.build.jobs` must be a non-negative integer"
+                raise TypeError(message)
+
+        # 0 means one job per available CPU
+        return jobs or os.cpu_count() or 1
+
+    @cached_property
+    def extract(self) -> bool:
+        if "extract" in self.target_config:
+            extract = self.target_config["extract"]
+            if not isinstance(extract, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.extract` must be a boolean"
+                raise TypeError(message)
+        else:
+            extract = self.build_config.get("extract", False)
+            if not isinstance(extract, bool):
+                message = "Field `tool.hatch.build.extract` must be a boolean"
+                raise TypeError(message)
+
+        return extract
+
+    @cached_property
+    def import_profiling(self) -> bool:
+        if "import-profiling" in self.target_config:
+            import_profiling = self.target_config["import-profiling"]
+            if not isinstance(import_profiling, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.import-profiling` must be a boolean"
+                raise TypeError(message)
+        else:
+            import_profiling = self.build_config.get("import-profiling", False)
+            if not isinstance(import_profiling, bool):
+                message = "Field `tool.hatch.build.import-profiling` must be a boolean"
+                raise TypeError(message)
+
+        return import_profiling
+
+    @cached_property
+    def compile_bytecode(self) -> bool:
+        if "compile-bytecode" in self.target_config:
+            compile_bytecode = self.target_config["compile-bytecode"]
+            if not isinstance(compile_bytecode, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.compile-bytecode` must be a boolean"
+                raise TypeError(message)
+        else:
+            compile_bytecode = self.build_config.get("compile-bytecode", False)
+            if not isinstance(compile_bytecode, bool):
+                message = "Field `tool.hatch.build.compile-bytecode` must be a boolean"
+                raise TypeError(message)
+
+        return compile_bytecode
+
+    @cached_property
+    def optimize(self) -> int:
+        if "optimize" in self.target_config:
+            optimize = self.target_config["optimize"]
+            if optimize not in {0, 1, 2} or isinstance(optimize, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.optimize` must be 0, 1 or 2"
+                raise TypeError(message)
+        else:
+            optimize = self.build_config.get("optimize", 0)
+            if optimize not in {0, 1, 2} or isinstance(optimize, bool):
+                message = "Field `tool.hatch.build.optimize` must be 0, 1 or 2"
+                raise TypeError(message)
+
+        return optimize
+
+    @cached_property
+    def sourceless(self) -> bool:
+        if "sourceless" in self.target_config:
+            sourceless = self.target_config["sourceless"]
+            if not isinstance(sourceless, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.sourceless` must be a boolean"
+                raise TypeError(message)
+        else:
+            sourceless = self.build_config.get("sourceless", False)
+            if not isinstance(sourceless, bool):
+                message = "Field `tool.hatch.build.sourceless` must be a boolean"
+                raise TypeError(message)
+
+        if sourceless and not self.compile_bytecode:
+            message = "Sourceless archives require `compile-bytecode` to be enabled"
+            raise ValueError(message)
+
+        return sourceless
+
+    @cached_property
+    def bytecode_interpreter(self) -> str | None:
+        if "bytecode-interpreter" in self.target_config:
+            bytecode_interpreter = self.target_config["bytecode-interpreter"]
+            if not isinstance(bytecode_interpreter, str):
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.bytecode-interpreter` must be a string"
+                )
+                raise TypeError(message)
+        else:
+            bytecode_interpreter = self.build_config.get("bytecode-interpreter", None)
+            if bytecode_interpreter is not None and not isinstance(bytecode_interpreter, str):
+                message = "Field `tool.hatch.build.bytecode-interpreter` must be a string"
+                raise TypeError(message)
+
+        return bytecode_interpreter
+
+    @cached_property
+    def report(self) -> bool:
+        if "report" in self.target_config:
+            report = self.target_config["report"]
+            if not isinstance(report, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.report` must be a boolean"
+                raise TypeError(message)
+        else:
+            report = self.build_config.get("report", False)
+            if not isinstance(report, bool):
+                message = "Field `tool.hatch.build.report` must be a boolean"
+                raise TypeError(message)
+
+        return report
+
+    @cached_property
+    def incremental(self) -> bool:
+        if "incremental" in self.target_config:
+            incremental = self.target_config["incremental"]
+            if not isinstance(incremental, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.incremental` must be a boolean"
+                raise TypeError(message)
+        else:
+            incremental = self.build_config.get("incremental", False)
+            if not isinstance(incremental, bool):
+                message = "Field `tool.hatch.build.incremental` must be a boolean"
+                raise TypeError(message)
+
+        return incremental
+
+    @cached_property
+    def skip_unchanged(self) -> bool:
+        if "skip-unchanged" in self.target_config:
+            skip_unchanged = self.target_config["skip-unchanged"]
+            if not isinstance(skip_unchanged, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.skip-unchanged` must be a boolean"
+                raise TypeError(message)
+        else:
+            skip_unchanged = self.build_config.get("skip-unchanged", False)
+            if not isinstance(skip_unchanged, bool):
+                message = "Field `tool.hatch.build.skip-unchanged` must be a boolean"
+                raise TypeError(message)
+
+        return skip_unchanged
+
+    @cached_property
+    def dependency_cache(self) -> bool:
+        if "dependency-cache" in self.target_config:
+            dependency_cache = self.target_config["dependency-cache"]
+            if not isinstance(dependency_cache, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.dependency-cache` must be a boolean"
+                raise TypeError(message)
+        else:
+            dependency_cache = self.build_config.get("dependency-cache", False)
+            if not isinstance(dependency_cache, bool):
+                message = "Field `tool.hatch.build.dependency-cache` must be a boolean"
+                raise TypeError(message)
+
+        return dependency_cache
+
+    @cached_property
+    def dependency_cache_dir(self) -> str:
+        if "dependency-cache-dir" in self.target_config:
+            dependency_cache_dir = self.target_config["dependency-cache-dir"]
+            if not isinstance(dependency_cache_dir, str):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.dependency-cache-dir` must be a string"
+                raise TypeError(message)
+        else:
+            dependency_cache_dir = self.build_config.get("dependency-cache-dir", default_cache_directory())
+            if not isinstance(dependency_cache_dir, str):
+                message = "Field `tool.hatch.build.dependency-cache-dir` must be a string"
+                raise TypeError(message)
+
+        return os.path.normpath(os.path.join(self.root, os.path.expanduser(dependency_cache_dir)))
+
+    @cached_property
+    def dependency_cache_max_size(self) -> int:
+        if "dependency-cache-max-size" in self.target_config:
+            max_size = self.target_config["dependency-cache-max-size"]
+            if not isinstance(max_size, int) or isinstance(max_size, bool) or max_size < 0:
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.dependency-cache-max-size` "
+                    f"must be a non-negative integer"
+                )
+                raise TypeError(message)
+        else:
+            max_size = self.build_config.get("dependency-cache-max-size", 2048)
+            if not isinstance(max_size, int) or isinstance(max_size, bool) or max_size < 0:
+                message = "Field `tool.hatch.build.dependency-cache-max-size` must be a non-negative integer"
+                raise TypeError(message)
+
+        # configured in MiB
+        return max_size * 1024 * 1024
+
+    @cached_property
+    def lock_file(self) -> str | None:
+        if "lock-file" in self.target_config:
+            lock_file = self.target_config["lock-file"]
+            if not isinstance(lock_file, str):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.lock-file` must be a string"
+                raise TypeError(message)
+        else:
+            lock_file = self.build_config.get("lock-file")
+            if lock_file is not None and not isinstance(lock_file, str):
+                message = "Field `tool.hatch.build.lock-file` must be a string"
+                raise TypeError(message)
+
+        if lock_file is None:
+            return None
+        return os.path.normpath(os.path.join(self.root, lock_file))
+
+    @cached_property
+    def wheelhouse(self) -> str:
+        if "wheelhouse" in self.target_config:
+            wheelhouse = self.target_config["wheelhouse"]
+            if not isinstance(wheelhouse, str):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.wheelhouse` must be a string"
+                raise TypeError(message)
+        else:
+            wheelhouse = self.build_config.get("wheelhouse", os.path.join(default_cache_directory(), "wheelhouse"))
+            if not isinstance(wheelhouse, str):
+                message = "Field `tool.hatch.build.wheelhouse` must be a string"
+                raise TypeError(message)
+
+        return os.path.normpath(os.path.join(self.root, os.path.expanduser(wheelhouse)))
+
+    @cached_property
+    def dependency_exclude(self) -> list[str]:
+        if "dependency-exclude" in self.target_config:
+            patterns = self.target_config["dependency-exclude"]
+            if not isinstance(patterns, list) or not all(isinstance(pattern, str) for pattern in patterns):
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.dependency-exclude` "
+                    f"must be an array of strings"
+                )
+                raise TypeError(message)
+        else:
+            patterns = self.build_config.get("dependency-exclude", [])
+            if not isinstance(patterns, list) or not all(isinstance(pattern, str) for pattern in patterns):
+                message = "Field `tool.hatch.build.dependency-exclude` must be an array of strings"
+                raise TypeError(message)
+
+        return patterns
+
+    @cached_property
+    def tree_shake(self) -> bool:
+        if "tree-shake" in self.target_config:
+            tree_shake = self.target_config["tree-shake"]
+            if not isinstance(tree_shake, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.tree-shake` must be a boolean"
+                raise TypeError(message)
+        else:
+            tree_shake = self.build_config.get("tree-shake", False)
+            if not isinstance(tree_shake, bool):
+                message = "Field `tool.hatch.build.tree-shake` must be a boolean"
+                raise TypeError(message)
+
+        return tree_shake
+
+    @cached_property
+    def tree_shake_keep(self) -> list[str]:
+        if "tree-shake-keep" in self.target_config:
+            modules = self.target_config["tree-shake-keep"]
+            if not isinstance(modules, list) or not all(isinstance(module, str) for module in modules):
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.tree-shake-keep` must be an array of strings"
+                )
+                raise TypeError(message)
+        else:
+            modules = self.build_config.get("tree-shake-keep", [])
+            if not isinstance(modules, list) or not all(isinstance(module, str) for module in modules):
+                message = "Field `tool.hatch.build.tree-shake-keep` must be an array of strings"
+                raise TypeError(message)
+
+        return modules
+
+    @cached_property
+    def interpreter_flags(self) -> list[str]:
+        if "interpreter-flags" in self.target_config:
+            flags = self.target_config["interpreter-flags"]
+            if not isinstance(flags, list) or not all(isinstance(flag, str) for flag in flags):
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.interpreter-flags` must be an array of strings"
+                )
+                raise TypeError(message)
+        else:
+            flags = self.build_config.get("interpreter-flags", [])
+            if not isinstance(flags, list) or not all(isinstance(flag, str) for flag in flags):
+                message = "Field `tool.hatch.build.interpreter-flags` must be an array of strings"
+                raise TypeError(message)
+
+        for flag in flags:
+            if not flag.startswith("-") or len(flag.split()) != 1:
+                message = f"Flag `{flag}` of field `interpreter-flags` must start with `-` and contain no whitespace"
+                raise ValueError(message)
+        # the kernel passes everything after the program of a shebang line as one argument, which only `env -S` splits
+        if len(flags) > 1 and not is_env(self.interpreter):
+            message = (
+                "Field `interpreter-flags` must hold a single argument, such as `-sE`, unless the interpreter is run "
+                "through `/usr/bin/env`"
+            )
+            raise ValueError(message)
+
+        return flags
+
+    @cached_property
+    def precompute_sys_path(self) -> bool:
+        if "precompute-sys-path" in self.target_config:
+            precompute_sys_path = self.target_config["precompute-sys-path"]
+            if not isinstance(precompute_sys_path, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.precompute-sys-path` must be a boolean"
+                raise TypeError(message)
+        else:
+            precompute_sys_path = self.build_config.get("precompute-sys-path", False)
+            if not isinstance(precompute_sys_path, bool):
+                message = "Field `tool.hatch.build.precompute-sys-path` must be a boolean"
+                raise TypeError(message)
+
+        return precompute_sys_path
+
+    @cached_property
+    def lazy_imports(self) -> bool:
+        if "lazy-imports" in self.target_config:
+            lazy_imports = self.target_config["lazy-imports"]
+            if not isinstance(lazy_imports, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.lazy-imports` must be a boolean"
+                raise TypeError(message)
+        else:
+            lazy_imports = self.build_config.get("lazy-imports", False)
+            if not isinstance(lazy_imports, bool):
+                message = "Field `tool.hatch.build.lazy-imports` must be a boolean"
+                raise TypeError(message)
+
+        # extracted modules are not imported from the archive
+        if lazy_imports and self.extract:
+            message = "Field `lazy-imports` cannot be combined with `extract`"
+            raise ValueError(message)
+
+        return lazy_imports
+
+    @cached_property
+    def validate(self) -> list[str] | None:
+        if "validate" in self.target_config:
+            validate = self.target_config["validate"]
+            if not isinstance(validate, (bool, list)) or (
+                isinstance(validate, list) and not all(isinstance(argument, str) for argument in validate)
+            ):
+                message = (
+                    f"Field `tool.hatch.build.targets.{self.plugin_name}.validate` "
+                    f"must be a boolean or an array of strings"
+                )
+                raise TypeError(message)
+        else:
+            validate = self.build_config.get("validate", False)
+            if not isinstance(validate, (bool, list)) or (
+                isinstance(validate, list) and not all(isinstance(argument, str) for argument in validate)
+            ):
+                message = "Field `tool.hatch.build.validate` must be a boolean or an array of strings"
+                raise TypeError(message)
+
+        if isinstance(validate, bool):
+            # the arguments the artifact is run with, if at all
+            return [] if validate else None
+        return validate
+
+    @cached_property
+    def mapped_resources(self) -> bool:
+        if "mapped-resources" in self.target_config:
+            mapped_resources = self.target_config["mapped-resources"]
+            if not isinstance(mapped_resources, bool):
+                message = f"Field `tool.hatch.build.targets.{self.plugin_name}.mapped-resources` must be a boolean"
+                raise TypeError(message)
+        else:
+            mapped_resources = self.build_config.get("mapped-resources", False)
+            if not isinstance(mapped_resources, bool):
+                message = "Field `tool.hatch.build.mapped-resources` must be a boolean"
+                raise TypeError(message)
+
+        return mapped_resources
+
     if sys.platform in {"darwin", "win32"}:
 
         @staticmethod
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING, Any
+
+from hatch_pyz.incremental import MANIFEST, file_digest
+from hatch_pyz.scan import get_stat
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from hatchling.builders.plugin.interface import IncludedFile
+
+FINGERPRINT_SUFFIX = ".fingerprint"
+FINGERPRINT_VERSION = 1
+
+
+def get_fingerprint_path(artifact_path: str) -> str:
+    return f"{artifact_path}{FINGERPRINT_SUFFIX}"
+
+
+def get_plugin_version() -> str:
+    try:
+        return version("hatch-pyz")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_artifact_stats(paths: Sequence[str]) -> dict[str, dict[str, int]] | None:
+    """
+    Identify the artifacts by size and modification time, or return None if any is missing.
+    """
+    artifacts = {}
+    for path in paths:
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        artifacts[os.path.basename(path)] = {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}
+    return artifacts
+
+
+class Fingerprint:
+    """
+    Identifies the inputs of a build: the options given, and the path, permissions and SHA-256 of every included file.
+
+    Files whose size and modification time match the previous fingerprint reuse its hash, and the others are hashed
+    by a thread pool, so that checking an unchanged project takes a `stat` call per file.
+    """
+
+    def __init__(self, digest: str, files: MANIFEST):
+        self.digest = digest
+        # size, modification time, permissions and content hash of each file by its path in the archive
+        self.files = files
+
+    @classmethod
+    def compute(
+        cls, included_files: Sequence[IncludedFile], options: dict[str, Any], previous: Fingerprint | None = None
+    ) -> Fingerprint:
+        previous_files = previous.files if previous is not None else {}
+        files: MANIFEST = {}
+        to_hash = []
+        for included_file in included_files:
+            file_stat = get_stat(included_file)
+            distribution_path = included_file.distribution_path.replace(os.sep, "/")
+            files[distribution_path] = {
+                "size": file_stat.st_size,
+                "mtime_ns": file_stat.st_mtime_ns,
+                "mode": stat.S_IMODE(file_stat.st_mode),
+                "sha256": None,
+            }
+            recorded = previous_files.get(distribution_path)
+            if (
+                recorded is not None
+                and recorded["size"] == file_stat.st_size
+                and recorded["mtime_ns"] == file_stat.st_mtime_ns
+            ):
+                files[distribution_path]["sha256"] = recorded["sha256"]
+            else:
+                to_hash.append((distribution_path, included_file.path))
+
+        if to_hash:
+            with ThreadPoolExecutor() as executor:
+                digests = executor.map(file_digest, [path for _, path in to_hash])
+                for (distribution_path, _), digest in zip(to_hash, digests):
+                    files[distribution_path]["sha256"] = digest
+
+        inputs = {
+            "options": options,
+            "files": {path: [entry["mode"], entry["sha256"]] for path, entry in files.items()},
+        }
+        hasher = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode())
+        return cls(hasher.hexdigest(), files)
+
+    @classmethod
+    def load(cls, path: str) -> tuple[Fingerprint, dict[str, Any]] | None:
+        """
+        Read a fingerprint along with the artifacts it was recorded for.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != FINGERPRINT_VERSION:
+            return None
+        return cls(data["digest"], data["files"]), data["artifacts"]
+
+    def write(self, path: str, artifacts: dict[str, dict[str, int]]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": FINGERPRINT_VERSION, "digest": self.digest, "artifacts": artifacts, "files": self.files},
+                f,
+                sort_keys=True,
+            )
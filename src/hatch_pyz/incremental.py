@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import zipfile
+from typing import Any, Dict
+
+from hatch_pyz.compression import CompressedData, set_compresslevel
+
+if sys.version_info >= (3, 10):
+    from typing import TypeAlias
+else:
+    from typing_extensions import TypeAlias
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+MANIFEST: TypeAlias = Dict[str, Dict[str, Any]]
+
+# https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT section 4.3.7
+LOCAL_HEADER_FORMAT = "<4s2B4HL2L2H"
+LOCAL_HEADER_SIZE = struct.calcsize(LOCAL_HEADER_FORMAT)
+LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+
+
+def get_manifest_path(artifact_path: str) -> str:
+    return f"{artifact_path}{MANIFEST_SUFFIX}"
+
+
+def file_digest(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def write_manifest(path: str, options: dict[str, Any], entries: MANIFEST) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "options": options, "entries": entries}, f, sort_keys=True)
+
+
+def to_dos_time(date_time: tuple[int, ...]) -> tuple[int, ...]:
+    # zip timestamps have a two second resolution
+    return (*date_time[:5], date_time[5] // 2)
+
+
+def read_raw_entry(fp: Any, zip_info: zipfile.ZipInfo) -> bytes:
+    """
+    Read the still-compressed data of an entry from an open archive file.
+    """
+    fp.seek(zip_info.header_offset)
+    header = fp.read(LOCAL_HEADER_SIZE)
+    fields = struct.unpack(LOCAL_HEADER_FORMAT, header)
+    if fields[0] != LOCAL_HEADER_SIGNATURE:
+        message = f"Bad local file header for entry `{zip_info.filename}`"
+        raise zipfile.BadZipFile(message)
+
+    # the local extra field may differ from the central directory's copy
+    fp.seek(fields[10] + fields[11], os.SEEK_CUR)
+    return fp.read(zip_info.compress_size)
+
+
+class PreviousArchive:
+    """
+    A previously built artifact and its manifest, from which entries whose source files are unchanged can be copied
+    without recompressing them.
+
+    Files whose size and modification time match the manifest are assumed unchanged; otherwise their content hash is
+    compared. An entry is only reused if the header a fresh build would write for it is identical, which keeps
+    incremental output byte-identical to a clean build.
+    """
+
+    def __init__(self, archive_path: str, entries: MANIFEST):
+        self.entries = entries
+        self.zf = zipfile.ZipFile(archive_path, "r")
+        self.fp = open(archive_path, "rb")  # noqa: SIM115
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, archive_path: str, options: dict[str, Any]) -> PreviousArchive | None:
+        try:
+            with open(get_manifest_path(archive_path), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("options") != options:
+            return None
+
+        try:
+            return cls(archive_path, manifest["entries"])
+        except (OSError, zipfile.BadZipFile):
+            return None
+
+    def get_entry(
+        self, path: str, zip_info: zipfile.ZipInfo, file_stat: os.stat_result, *, auto_store: bool = False
+    ) -> CompressedData | None:
+        """
+        Return the previous compressed data for the file if it can be reused. With `auto_store`, a previously stored
+        entry is also accepted where compression was configured, since unchanged content was stored for lack of
+        savings and would be again.
+        """
+        recorded = self.entries.get(zip_info.filename)
+        if recorded is None or recorded["size"] != file_stat.st_size:
+            return None
+
+        try:
+            previous_info = self.zf.getinfo(zip_info.filename)
+        except KeyError:
+            return None
+
+        compress_type = zip_info.compress_type
+        if auto_store and previous_info.compress_type == zipfile.ZIP_STORED:
+            compress_type = zipfile.ZIP_STORED
+
+        if (
+            previous_info.compress_type != compress_type
+            or to_dos_time(previous_info.date_time) != to_dos_time(zip_info.date_time)
+            or previous_info.external_attr != zip_info.external_attr
+            or previous_info.file_size != file_stat.st_size
+        ):
+            return None
+
+        digest = recorded["sha256"]
+        if recorded["mtime_ns"] != file_stat.st_mtime_ns and file_digest(path) != digest:
+            return None
+
+        with self.lock:
+            data = read_raw_entry(self.fp, previous_info)
+        if compress_type != zip_info.compress_type:
+            zip_info.compress_type = compress_type
+            set_compresslevel(zip_info, None)
+        return CompressedData(data, previous_info.CRC, previous_info.file_size, digest)
+
+    def close(self) -> None:
+        self.zf.close()
+        self.fp.close()
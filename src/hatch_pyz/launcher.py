@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import subprocess
+from typing import NamedTuple
+
+# Prints the version, prefix and `sys.path` the interpreter would have with `site` processed, even when it was skipped
+# with `-S`, so that the generated `__main__` can restore it without running `site` on every start. `-c` puts the
+# current directory first, where the application goes, unless `-I` or `-P` leave it out.
+PRINT_SYS_PATH = """\
+import json, os, sys
+if sys.flags.no_site:
+    import site
+    site.main()
+path = sys.path
+if not (sys.flags.isolated or getattr(sys.flags, "safe_path", False)):
+    path = path[1:]
+print(json.dumps({
+    "version": sys.version_info[:2],
+    "prefix": sys.prefix,
+    "path": [os.path.abspath(entry) for entry in path if os.path.exists(entry)],
+}))
+"""
+
+
+class SysPath(NamedTuple):
+    version: tuple[int, int]
+    prefix: str
+    path: list[str]
+
+    def get_bootstrap(self) -> tuple[str, ...]:
+        """
+        Return the lines of `__main__` that restore the recorded `sys.path` when the artifact is run by the interpreter
+        it was recorded from and all of its entries still exist, and that otherwise run `site` if `-S` skipped it.
+        """
+        condition = (
+            f"sys.version_info[:2] == {self.version!r} and sys.prefix == {self.prefix!r} "
+            f"and all(os.path.exists(entry) for entry in sys_path)"
+        )
+        return (
+            "import os, sys",
+            f"sys_path = {self.path!r}",
+            f"if {condition}:",
+            "    sys.path[1:] = sys_path",
+            "elif sys.flags.no_site:",
+            "    import site",
+            "    site.main()",
+        )
+
+
+def is_env(interpreter: str) -> bool:
+    parts = interpreter.split()
+    return len(parts) > 1 and os.path.basename(parts[0]) == "env"
+
+
+def get_shebang(interpreter: str, flags: list[str]) -> str:
+    """
+    Return the shebang line, without `#!`, that runs `interpreter` with `flags`.
+
+    Everything after the program in a shebang line reaches it as a single argument, so `env` is given `-S` to split
+    its arguments again when flags follow the interpreter it looks up.
+    """
+    if not flags:
+        return interpreter
+    if is_env(interpreter) and interpreter.split()[1] not in {"-S", "--split-string"}:
+        program, _, arguments = interpreter.partition(" ")
+        interpreter = f"{program} -S {arguments.lstrip()}"
+    return " ".join([interpreter, *flags])
+
+
+def get_launcher_command(interpreter: str, flags: list[str]) -> list[str]:
+    """
+    Return the command that the shebang line runs, to start the interpreter the same way outside of the artifact.
+    """
+    return [*shlex.split(interpreter), *flags]
+
+
+def get_sys_path(command: list[str]) -> SysPath:
+    """
+    Find the entries that follow the application on `sys.path` when it is run by `command`, leaving out those that do
+    not exist, along with the version and prefix of the interpreter they belong to.
+    """
+    try:
+        output = subprocess.check_output([*command, "-c", PRINT_SYS_PATH], stdin=subprocess.DEVNULL, text=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        message = f"Could not find the `sys.path` of interpreter `{shlex.join(command)}`: {e}"
+        raise RuntimeError(message) from e
+    sys_path = json.loads(output)
+    return SysPath(tuple(sys_path["version"]), sys_path["prefix"], sys_path["path"])
+
+
+def validate_artifact(artifact: str, command: list[str], arguments: list[str]) -> None:
+    """
+    Run the artifact with `arguments` by the command its shebang line runs, and fail unless it exits with status 0.
+    """
+    run = [*command, artifact, *arguments]
+    try:
+        process = subprocess.run(
+            run, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, check=False
+        )
+    except OSError as e:
+        message = f"Could not run {os.path.basename(artifact)} to validate it: {e}"
+        raise RuntimeError(message) from e
+
+    if process.returncode:
+        message = (
+            f"Validation of {os.path.basename(artifact)} failed: `{shlex.join(run)}` exited with status "
+            f"{process.returncode}\n{process.stdout}"
+        )
+        raise RuntimeError(message)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from hatch_pyz.cache import normalize_requirements
+from hatch_pyz.compression import CHUNK_SIZE
+from hatch_pyz.incremental import file_digest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+LOCK_VERSION = 1
+
+# downloads are network bound, so use more threads than there are CPUs
+FETCH_WORKERS = 8
+
+
+class LockedPackage(NamedTuple):
+    name: str
+    version: str
+    filename: str
+    url: str
+    sha256: str
+
+    def to_requirement(self) -> str:
+        return f"{self.name}=={self.version} --hash=sha256:{self.sha256}"
+
+
+class LockFile(NamedTuple):
+    dependencies: list[str]
+    packages: list[LockedPackage]
+
+    @classmethod
+    def read(cls, path: str) -> LockFile:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != LOCK_VERSION:
+            message = f"Lock file `{path}` has unsupported version {data.get('version')!r}"
+            raise ValueError(message)
+        return cls(data["dependencies"], [LockedPackage(**package) for package in data["packages"]])
+
+    def write(self, path: str) -> None:
+        data = {
+            "version": LOCK_VERSION,
+            "dependencies": self.dependencies,
+            "packages": [package._asdict() for package in self.packages],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    def is_current(self, dependencies: Iterable[str]) -> bool:
+        return self.dependencies == normalize_requirements(dependencies)
+
+    def get_key(self) -> str:
+        return hashlib.sha256("\n".join(package.sha256 for package in self.packages).encode()).hexdigest()
+
+
+def resolve(dependencies: Sequence[str]) -> LockFile:
+    """
+    Resolve `dependencies` for the running interpreter with pip, without installing anything, and pin every package
+    of the result to the file pip chose and its hash. Index options such as `PIP_INDEX_URL`, `PIP_FIND_LINKS` and
+    `PIP_NO_INDEX` are honoured as usual.
+    """
+    with tempfile.TemporaryDirectory() as temp_directory:
+        report_path = os.path.join(temp_directory, "report.json")
+        pip_command = [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--no-input",
+            "--disable-pip-version-check",
+            "--no-color",
+            "--quiet",
+            "--dry-run",
+            "--ignore-installed",
+            "--report", report_path,
+        ]
+        subprocess.check_call(pip_command + list(dependencies))
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+
+    packages = [get_locked_package(item) for item in report["install"]]
+    packages.sort(key=lambda package: package.name)
+    return LockFile(normalize_requirements(dependencies), packages)
+
+
+def get_locked_package(item: dict[str, Any]) -> LockedPackage:
+    # https://pip.pypa.io/en/stable/reference/installation-report/
+    name = item["metadata"]["name"]
+    download_info = item["download_info"]
+    sha256 = download_info.get("archive_info", {}).get("hashes", {}).get("sha256")
+    if sha256 is None:
+        message = f"Cannot lock `{name}`: only archives with a known SHA-256 hash can be locked"
+        raise ValueError(message)
+
+    url = download_info["url"]
+    filename = urllib.parse.unquote(os.path.basename(urllib.parse.urlsplit(url).path))
+    return LockedPackage(name, item["metadata"]["version"], filename, url, sha256)
+
+
+def fetch_package(package: LockedPackage, wheelhouse: str) -> bool:
+    """
+    Download a locked package into the wheelhouse unless an intact copy is already there, and return whether it was
+    downloaded. The file only appears under its final name once its hash has been verified.
+    """
+    path = os.path.join(wheelhouse, package.filename)
+    if os.path.isfile(path) and file_digest(path) == package.sha256:
+        return False
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{package.filename}-", dir=wheelhouse)
+    try:
+        hasher = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out_file, urllib.request.urlopen(package.url) as response:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                out_file.write(chunk)
+
+        if hasher.hexdigest() != package.sha256:
+            message = (
+                f"Hash mismatch for `{package.filename}` downloaded from {package.url}: "
+                f"expected {package.sha256}, got {hasher.hexdigest()}"
+            )
+            raise ValueError(message)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return True
+
+
+def fetch(packages: Sequence[LockedPackage], wheelhouse: str, workers: int = FETCH_WORKERS) -> int:
+    """
+    Populate the wheelhouse with every locked package in parallel and return the number of files downloaded.
+    """
+    os.makedirs(wheelhouse, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(lambda package: fetch_package(package, wheelhouse), packages))
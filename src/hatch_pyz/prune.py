@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import ast
+from collections import deque
+from typing import TYPE_CHECKING, Callable
+
+import pathspec
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+EXTENSION_SUFFIXES = (".so", ".pyd")
+
+
+def get_module_name(path: str) -> tuple[str, bool] | None:
+    """
+    Return the module a file defines, given its path relative to an import root, and whether it is a package.
+    """
+    parts = path.split("/")
+    filename = parts.pop()
+    if filename.endswith(".py"):
+        name = filename[:-3]
+    elif filename.endswith(EXTENSION_SUFFIXES):
+        # e.g. _speedups.cpython-312-x86_64-linux-gnu.so
+        name = filename.split(".", 1)[0]
+    else:
+        return None
+
+    if name == "__init__":
+        return ".".join(parts), True
+    if not all(part.isidentifier() for part in (*parts, name)):
+        return None
+    return ".".join((*parts, name)), False
+
+
+def find_imports(source: bytes, module: str, *, is_package: bool) -> set[str]:
+    """
+    Find every module `source` may import, including relative imports and calls to `importlib.import_module` or
+    `__import__` with a literal name. Imports inside functions and `try` blocks are included, so the result
+    over-approximates what actually gets imported.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    package_parts = module.split(".") if is_package else module.split(".")[:-1]
+    imports: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if node.level - 1 > len(package_parts):
+                    continue
+                base_parts = package_parts[: len(package_parts) - node.level + 1]
+                base = ".".join([*base_parts, node.module] if node.module else base_parts)
+            else:
+                base = node.module or ""
+            if not base:
+                continue
+            imports.add(base)
+            # `from package import name` may import a submodule
+            imports.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+        elif (
+            isinstance(node, ast.Call)
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+            and (
+                (isinstance(node.func, ast.Name) and node.func.id in {"__import__", "import_module"})
+                or (isinstance(node.func, ast.Attribute) and node.func.attr == "import_module")
+            )
+        ):
+            imports.add(node.args[0].value)
+
+    return imports
+
+
+class DependencyPruner:
+    """
+    Selects which installed dependency files to bundle.
+
+    Files matching the `exclude` patterns, which use gitignore syntax relative to the installation directory, are
+    always dropped. With `tree_shake`, modules that cannot be reached by following imports from the project's own
+    modules are dropped too, along with the data files of unreachable packages and the metadata of distributions
+    left with no files. Modules and packages listed in `keep` are always treated as reachable, for code that is
+    imported dynamically.
+    """
+
+    def __init__(self, *, exclude: Iterable[str] = (), tree_shake: bool = False, keep: Iterable[str] = ()):
+        self.exclude_spec = pathspec.GitIgnoreSpec.from_lines(exclude)
+        self.tree_shake = tree_shake
+        self.keep = tuple(keep)
+
+    def is_excluded(self, path: str) -> bool:
+        return self.exclude_spec.match_file(path)
+
+    def is_kept_module(self, module: str) -> bool:
+        return any(module == keep or module.startswith(f"{keep}.") for keep in self.keep)
+
+    def find_reachable_modules(
+        self,
+        read: Callable[[str], bytes],
+        modules: dict[str, tuple[str, bool]],
+        roots: Iterable[tuple[str, str, bool]],
+        imports: Iterable[str] = (),
+    ) -> set[str]:
+        """
+        Follow imports from `roots`, given as `(path, module, is_package)`, and from the module names in `imports`
+        through the dependency `modules`, a map of module name to its path and whether it is a package. Dependency
+        sources are loaded with `read`.
+        """
+        reachable: set[str] = set()
+        queue: deque[str] = deque(module for module in modules if self.is_kept_module(module))
+
+        def enqueue(imported: Iterable[str]) -> None:
+            for name in imported:
+                parts = name.split(".")
+                # importing a submodule imports every parent package
+                queue.extend(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+        enqueue(imports)
+        for source_path, module, is_package in roots:
+            with open(source_path, "rb") as f:
+                enqueue(find_imports(f.read(), module, is_package=is_package))
+
+        while queue:
+            module = queue.popleft()
+            if module in reachable or module not in modules:
+                continue
+            reachable.add(module)
+            path, is_package = modules[module]
+            if path.endswith(".py"):
+                enqueue(find_imports(read(path), module, is_package=is_package))
+
+        return reachable
+
+    def select(
+        self,
+        read: Callable[[str], bytes],
+        files: list[str],
+        distributions: dict[str, str],
+        roots: Iterable[tuple[str, str, bool]],
+        imports: Iterable[str] = (),
+    ) -> tuple[list[str], list[str]]:
+        """
+        Split `files`, installed paths of the dependencies, into the files to bundle and the pruned ones.
+        `distributions` maps files to the distribution that installed them; `read`, `roots` and `imports` are as for
+        `find_reachable_modules`.
+        """
+        candidates = [path for path in files if not self.is_excluded(path)]
+        excluded = [path for path in files if self.is_excluded(path)]
+        if not self.tree_shake:
+            return candidates, excluded
+
+        modules = {}
+        for path in candidates:
+            module = get_module_name(path)
+            if module is not None:
+                modules[module[0]] = (path, module[1])
+        reachable = self.find_reachable_modules(read, modules, roots, imports)
+
+        selected: list[str] = []
+        unreachable: list[str] = []
+        for path in candidates:
+            module = get_module_name(path)
+            if module is not None:
+                keep = module[0] in reachable
+            elif ".dist-info/" in path:
+                # decided once the files of every distribution are known
+                continue
+            else:
+                # data files belong to the package of their directory; files outside any package are kept
+                package = path.rpartition("/")[0].replace("/", ".")
+                keep = (
+                    not package
+                    or package in reachable
+                    or any(name.startswith(f"{package}.") for name in reachable)
+                    or (package not in modules and not any(name.startswith(f"{package}.") for name in modules))
+                )
+            (selected if keep else unreachable).append(path)
+
+        used_distributions = {distributions[path] for path in selected if path in distributions}
+        for path in candidates:
+            if ".dist-info/" in path:
+                distribution = distributions.get(path)
+                keep = distribution is None or distribution in used_distributions
+                (selected if keep else unreachable).append(path)
+
+        kept = set(selected)
+        return [path for path in candidates if path in kept], excluded + unreachable
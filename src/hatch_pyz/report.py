@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from zipfile import ZipInfo
+
+REPORT_SUFFIX = ".report.json"
+
+# package that entries written by hatch-pyz itself, such as __main__.py, are attributed to
+GENERATED_PACKAGE = "(generated)"
+
+
+def get_report_path(artifact_path: str) -> str:
+    return f"{artifact_path}{REPORT_SUFFIX}"
+
+
+def read_record(path: str) -> dict[str, str]:
+    """
+    Map the files listed in a `*.dist-info/RECORD` file to the name of their distribution.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        return parse_record(os.path.basename(os.path.dirname(path)), f)
+
+
+def parse_record(dist_info: str, lines: Iterable[str]) -> dict[str, str]:
+    """
+    Like `read_record`, for the lines of the `RECORD` file in the `dist_info` directory.
+    """
+    name = dist_info[: -len(".dist-info")].rsplit("-", 1)[0]
+    return {row[0]: name for row in csv.reader(lines) if row}
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size:.0f} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class EntryStats(NamedTuple):
+    filename: str
+    package: str
+    file_size: int
+    compress_size: int
+    compress_type: int
+    seconds: float
+
+
+class BuildReport:
+    """
+    Collects the time spent in each phase of a build and statistics for every archive entry.
+
+    Phases may nest, for instance when file selection runs lazily while the archive is written; each phase is only
+    charged for the time not spent in the phases nested inside it.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        # phases that ran on a background thread, concurrently with the others
+        self.background: set[str] = set()
+        self.entries: list[EntryStats] = []
+        # archive path of each bundled dependency file to the distribution that installed it
+        self.distributions: dict[str, str] = {}
+        # files and bytes of dependencies left out of the archive, per distribution
+        self.pruned: dict[str, dict[str, int]] = {}
+        self.project_name = ""
+        self._stack: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        now = time.perf_counter()
+        if self._stack:
+            parent, started = self._stack[-1]
+            self.phases[parent] = self.phases.get(parent, 0.0) + now - started
+        self._stack.append((name, now))
+        try:
+            yield
+        finally:
+            _, started = self._stack.pop()
+            now = time.perf_counter()
+            self.phases[name] = self.phases.get(name, 0.0) + now - started
+            if self._stack:
+                parent, _ = self._stack[-1]
+                self._stack[-1] = (parent, now)
+
+    def add_background_phases(self, other: BuildReport) -> None:
+        """
+        Add the phases of a report timed on a background thread, which do not count towards the total time.
+        """
+        for name, seconds in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            self.background.add(name)
+
+    def timed(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """
+        Charge the time spent producing each item of a lazy iterable to the phase `name`.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def get_package(self, filename: str) -> str:
+        if filename in self.distributions:
+            return self.distributions[filename]
+        if filename == "__main__.py" or filename.startswith("_hatch_pyz/"):
+            return GENERATED_PACKAGE
+        return self.project_name
+
+    def add_entry(self, zip_info: ZipInfo, seconds: float) -> None:
+        self.entries.append(
+            EntryStats(
+                zip_info.filename,
+                self.get_package(zip_info.filename),
+                zip_info.file_size,
+                zip_info.compress_size,
+                zip_info.compress_type,
+                seconds,
+            )
+        )
+
+    def add_pruned(self, filename: str, size: int) -> None:
+        # files missing from RECORD are attributed to their top-level package
+        name = self.distributions.get(filename, filename.split("/", 1)[0])
+        package = self.pruned.setdefault(name, {"files": 0, "bytes": 0})
+        package["files"] += 1
+        package["bytes"] += size
+
+    def get_packages(self) -> dict[str, dict[str, Any]]:
+        packages: dict[str, dict[str, Any]] = {}
+        for entry in self.entries:
+            package = packages.setdefault(
+                entry.package, {"entries": 0, "file_size": 0, "compress_size": 0, "seconds": 0.0}
+            )
+            package["entries"] += 1
+            package["file_size"] += entry.file_size
+            package["compress_size"] += entry.compress_size
+            package["seconds"] += entry.seconds
+        return dict(sorted(packages.items(), key=lambda item: -item[1]["compress_size"]))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases": self.phases,
+            "background_phases": sorted(self.background),
+            "total": {
+                "entries": len(self.entries),
+                "file_size": sum(entry.file_size for entry in self.entries),
+                "compress_size": sum(entry.compress_size for entry in self.entries),
+            },
+            "packages": self.get_packages(),
+            "pruned": dict(sorted(self.pruned.items(), key=lambda item: -item[1]["bytes"])),
+            "entries": [entry._asdict() for entry in self.entries],
+        }
+
+    def get_summary(self) -> str:
+        total = sum(seconds for name, seconds in self.phases.items() if name not in self.background)
+        phases = ", ".join(
+            f"{name} {seconds:.2f}s{' in background' if name in self.background else ''}"
+            for name, seconds in sorted(self.phases.items(), key=lambda item: -item[1])
+        )
+        file_size = sum(entry.file_size for entry in self.entries)
+        compress_size = sum(entry.compress_size for entry in self.entries)
+        summary = (
+            f"Built {len(self.entries)} entries in {total:.2f}s ({phases}); "
+            f"{format_size(file_size)} compressed to {format_size(compress_size)}"
+        )
+        if self.pruned:
+            pruned_files = sum(package["files"] for package in self.pruned.values())
+            pruned_size = sum(package["bytes"] for package in self.pruned.values())
+            summary += f"; pruned {pruned_files} dependency files ({format_size(pruned_size)})"
+        return summary
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,4 @@
+"""
+Modules that are copied into built zipapps under the `_hatch_pyz` package. They run on the zipapp's interpreter
+without hatch-pyz installed, so they may only use the standard library.
+"""
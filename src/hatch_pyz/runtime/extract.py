@@ -0,0 +1,93 @@
+"""
+Extracts the contents of the zipapp to a cache directory on first run so native extensions can be loaded and modules
+are imported from the filesystem. Later runs only check that the directory exists.
+
+Set `HATCH_PYZ_ROOT` to change where archives are extracted.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+ROOT_ENV_VAR = "HATCH_PYZ_ROOT"
+
+# entries that only make sense inside the archive
+SKIPPED_ENTRIES = ("__main__.py", "_hatch_pyz/")
+
+
+def get_root():
+    root = os.environ.get(ROOT_ENV_VAR)
+    if root:
+        return os.path.expanduser(root)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "hatch-pyz", "Cache", "extracted")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/hatch-pyz/extracted")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "hatch-pyz", "extracted")
+
+
+@contextmanager
+def file_lock(path):
+    with open(path, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after 10 seconds
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def extract(archive, target):
+    root = os.path.dirname(target)
+    os.makedirs(root, exist_ok=True)
+
+    # concurrent first runs wait for whichever got the lock first, then find the directory in place
+    with file_lock(target + ".lock"):
+        if os.path.isdir(target):
+            return
+
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+        try:
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    if info.filename.startswith(SKIPPED_ENTRIES):
+                        continue
+                    path = zf.extract(info, staging)
+                    mode = (info.external_attr >> 16) & 0o777
+                    if mode:
+                        os.chmod(path, mode)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+
+def bootstrap(archive, build_id):
+    name = os.path.splitext(os.path.basename(archive))[0]
+    target = os.path.join(get_root(), f"{name}_{build_id}")
+    if not os.path.isdir(target):
+        extract(archive, target)
+    sys.path.insert(0, target)
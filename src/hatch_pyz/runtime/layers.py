@@ -0,0 +1,31 @@
+"""
+Puts the dependency layer an application archive was built with on `sys.path`. The layer is looked for next to the
+application, then in the directories listed in `HATCH_PYZ_LAYER_PATH`.
+"""
+
+import os
+import sys
+
+LAYER_PATH_ENV_VAR = "HATCH_PYZ_LAYER_PATH"
+
+
+def find_layer(archive, name):
+    directories = [os.path.dirname(os.path.abspath(archive))]
+    directories.extend(directory for directory in os.environ.get(LAYER_PATH_ENV_VAR, "").split(os.pathsep) if directory)
+    for directory in directories:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def add_layer(archive, name):
+    path = find_layer(archive, name)
+    if path is None:
+        message = (
+            f"Dependency layer {name} of {os.path.basename(archive)} was not found next to it or in "
+            f"${LAYER_PATH_ENV_VAR}"
+        )
+        sys.exit(message)
+    # right after the application, ahead of site-packages
+    sys.path.insert(1, path)
@@ -0,0 +1,38 @@
+"""
+Defers executing the modules imported from the application archive, and its dependency layer, until one of their
+attributes is first used, so that modules a run never needs are not loaded. The standard library is imported as
+usual.
+
+Modules with import-time side effects, such as registering plugins, only take effect once they are used.
+"""
+
+import sys
+import zipimport
+from importlib.util import LazyLoader
+
+
+class LazyFinder:
+    """
+    A meta path finder that defers to the finders after it and makes the loaders of zip archive modules lazy.
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        # as with the import profiler, only the finders after this one are asked, or the two would ask each other
+        meta_path = sys.meta_path
+        start = meta_path.index(self) + 1 if self in meta_path else 0
+        for finder in meta_path[start:]:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            # zipimport only supports `exec_module`, which LazyLoader requires, since Python 3.10
+            if isinstance(spec.loader, zipimport.zipimporter) and hasattr(spec.loader, "exec_module"):
+                spec.loader = LazyLoader(spec.loader)
+            return spec
+        return None
+
+
+def install():
+    sys.meta_path.insert(0, LazyFinder())
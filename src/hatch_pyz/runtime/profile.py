@@ -0,0 +1,156 @@
+"""
+Measures how long every module takes to import, split into the time spent loading its code, which for modules in the
+archive means reading, decompressing and unmarshalling it, and the time spent executing it.
+
+Enabled by setting `HATCH_PYZ_IMPORT_PROFILE` to `1`, which prints a summary per package and of the slowest modules
+to stderr at exit, or to a file path, which receives the measurements as JSON instead.
+"""
+
+import atexit
+import json
+import sys
+import time
+import zipimport
+from importlib.machinery import SourceFileLoader, SourcelessFileLoader
+
+# loaders whose `exec_module` only executes what `get_code` returns, so loading and executing can be timed apart
+SPLIT_LOADERS = (SourceFileLoader, SourcelessFileLoader, zipimport.zipimporter)
+
+SLOWEST_MODULES = 20
+SUMMARY_ROW = "{:<40} {:>8} {:>10} {:>10}"
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.1f}"
+
+
+class ProfilingLoader:
+    def __init__(self, profiler, loader):
+        self.profiler = profiler
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        create_module = getattr(self.loader, "create_module", None)
+        return create_module(spec) if create_module is not None else None
+
+    def exec_module(self, module):
+        # code such as importlib.resources expects the real loader
+        module.__loader__ = self.loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self.loader
+        self.profiler.exec_module(self.loader, module)
+
+
+class ImportProfiler:
+    """
+    A meta path finder that defers to the finders after it and wraps the loaders they return to time every import.
+    As with `-X importtime`, the time of nested imports is charged to the imported module rather than its importer.
+    """
+
+    def __init__(self):
+        # name -> (load seconds, exec seconds, cumulative seconds), in the order imports complete
+        self.modules = {}
+        # time spent in nested imports, for each import in progress
+        self.stack = []
+
+    def find_spec(self, fullname, path=None, target=None):
+        # only the finders after this one: a finder ahead of it that also defers to the others, as lazy imports do,
+        # would otherwise be asked again and ask back until the recursion limit
+        meta_path = sys.meta_path
+        start = meta_path.index(self) + 1 if self in meta_path else 0
+        for finder in meta_path[start:]:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            if isinstance(loader, SPLIT_LOADERS) or hasattr(loader, "exec_module"):
+                spec.loader = ProfilingLoader(self, loader)
+            return spec
+        return None
+
+    def exec_module(self, loader, module):
+        name = module.__name__
+        load = 0.0
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            if isinstance(loader, SPLIT_LOADERS):
+                code = loader.get_code(name)
+                load = time.perf_counter() - start
+                if code is None:
+                    message = f"cannot load module {name!r}"
+                    raise ImportError(message, name=name)
+                exec(code, module.__dict__)  # noqa: S102
+            else:
+                loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            nested = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += cumulative
+            self.modules[name] = (load, cumulative - nested - load, cumulative)
+
+    def get_packages(self):
+        packages = {}
+        for name, (load, execute, _) in self.modules.items():
+            package = packages.setdefault(name.partition(".")[0], {"modules": 0, "load": 0.0, "exec": 0.0})
+            package["modules"] += 1
+            package["load"] += load
+            package["exec"] += execute
+        return dict(sorted(packages.items(), key=lambda item: -(item[1]["load"] + item[1]["exec"])))
+
+    def to_dict(self):
+        return {
+            "total": {
+                "modules": len(self.modules),
+                "load": sum(load for load, _, _ in self.modules.values()),
+                "exec": sum(execute for _, execute, _ in self.modules.values()),
+            },
+            "packages": self.get_packages(),
+            "modules": [
+                {"name": name, "load": load, "exec": execute, "cumulative": cumulative}
+                for name, (load, execute, cumulative) in self.modules.items()
+            ],
+        }
+
+    def get_summary(self):
+        data = self.to_dict()
+        total = data["total"]
+        header = (
+            f"hatch-pyz import profile: {total['modules']} modules, load {format_ms(total['load'])} ms, "
+            f"exec {format_ms(total['exec'])} ms"
+        )
+        lines = [header, "", SUMMARY_ROW.format("package", "modules", "load ms", "exec ms")]
+        for name, package in data["packages"].items():
+            load, execute = format_ms(package["load"]), format_ms(package["exec"])
+            lines.append(SUMMARY_ROW.format(name, package["modules"], load, execute))
+
+        lines.extend(["", SUMMARY_ROW.format("slowest modules", "", "load ms", "exec ms")])
+        slowest = sorted(data["modules"], key=lambda module: -(module["load"] + module["exec"]))
+        for module in slowest[:SLOWEST_MODULES]:
+            lines.append(SUMMARY_ROW.format(module["name"], "", format_ms(module["load"]), format_ms(module["exec"])))
+        return "\n".join(lines)
+
+    def write(self, destination):
+        if destination == "1":
+            sys.stderr.write(self.get_summary() + "\n")
+            return
+
+        with open(destination, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def install(destination):
+    """
+    Start profiling imports and report to `destination`, the value of `HATCH_PYZ_IMPORT_PROFILE`, at exit.
+    """
+    profiler = ImportProfiler()
+    sys.meta_path.insert(0, profiler)
+    atexit.register(profiler.write, destination)
+    return profiler
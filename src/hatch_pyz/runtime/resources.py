@@ -0,0 +1,76 @@
+"""
+Reads resources packaged in the application archive without copying them. Each archive is memory-mapped once, and the
+data of entries stored uncompressed is returned as a `memoryview` of the mapping, found through the offsets the build
+recorded in `_hatch_pyz/resources.json`. Compressed entries, archives built without the index and packages that are not
+imported from an archive are read as usual.
+
+    from _hatch_pyz.resources import read_resource
+
+    data = read_resource("my_app.data", "model.bin")
+"""
+
+import importlib
+import json
+import mmap
+import os
+import sys
+import threading
+import zipimport
+
+RESOURCE_INDEX = "_hatch_pyz/resources.json"
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+# path of each archive resources were read from -> its MappedArchive, or None if it has no index
+archives = {}  # type: dict
+archives_lock = threading.Lock()
+
+
+class MappedArchive:
+    def __init__(self, path, entries):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        # archive path -> (local header offset, data offset, size) of each stored entry
+        self.entries = entries
+
+    def read(self, name):
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        header_offset, data_offset, size = entry
+        # the archive was changed since it was built, such as by prepending another shebang line
+        if self.map[header_offset : header_offset + 4] != LOCAL_HEADER_SIGNATURE or data_offset + size > len(self.map):
+            return None
+        return self.view[data_offset : data_offset + size]
+
+
+def get_mapped_archive(loader):
+    path = loader.archive
+    with archives_lock:
+        if path not in archives:
+            try:
+                entries = json.loads(loader.get_data(os.path.join(path, *RESOURCE_INDEX.split("/"))).decode("utf-8"))
+            except OSError:
+                archives[path] = None
+            else:
+                archives[path] = MappedArchive(path, entries)
+        return archives[path]
+
+
+def read_resource(package, resource):
+    """
+    Return the contents of `resource`, a `/`-separated path relative to `package`, as a read-only `memoryview` of
+    the mapped archive if it is stored uncompressed, or else as bytes.
+    """
+    module = sys.modules.get(package) or importlib.import_module(package)
+    directory = os.path.dirname(module.__file__)
+    loader = module.__spec__.loader
+    if isinstance(loader, zipimport.zipimporter):
+        mapped_archive = get_mapped_archive(loader)
+        if mapped_archive is not None:
+            prefix = directory[len(loader.archive) + 1 :].replace(os.sep, "/")
+            data = mapped_archive.read(f"{prefix}/{resource}" if prefix else resource)
+            if data is not None:
+                return data
+
+    return loader.get_data(os.path.join(directory, *resource.split("/")))
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from hatchling.builders.plugin.interface import IncludedFile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class ScannedFile(IncludedFile):
+    """
+    An included file along with the result of the `stat` call made while scanning for it, so that the archive writer
+    does not need to make its own.
+    """
+
+    __slots__ = ("stat",)
+
+    def __init__(self, path: str, relative_path: str, distribution_path: str, stat: os.stat_result) -> None:
+        super().__init__(path, relative_path, distribution_path)
+        self.stat = stat
+
+
+def get_stat(included_file: IncludedFile) -> os.stat_result:
+    if isinstance(included_file, ScannedFile):
+        return included_file.stat
+    return os.stat(included_file.path)
+
+
+def scan_file(included_file: IncludedFile) -> ScannedFile:
+    return ScannedFile(
+        included_file.path,
+        included_file.relative_path,
+        included_file.distribution_path,
+        os.stat(included_file.path),
+    )
+
+
+def scan_tree(directory: str) -> Iterator[tuple[str, os.stat_result]]:
+    """
+    Lazily yield the path relative to `directory`, using forward slashes, and the `stat` result of every file below
+    it, in the order of a sorted `os.walk`: the files of a directory by name, then each of its subdirectories by name.
+
+    Only the listing of the current directory and the subdirectories left to visit are held in memory, so memory use
+    does not grow with the number of files.
+    """
+    # directories still to visit, each with its path relative to `directory`
+    stack = [("", directory)]
+    while stack:
+        relative_directory, path = stack.pop()
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = f"{relative_directory}{entry.name}"
+            if entry.is_dir():
+                # like `os.walk`, symbolic links to directories are not followed
+                if not entry.is_symlink():
+                    subdirectories.append((f"{relative_path}/", entry.path))
+            else:
+                yield relative_path, entry.stat()
+        stack.extend(reversed(subdirectories))
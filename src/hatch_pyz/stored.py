@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import mmap
+import os
+import zlib
+from typing import IO, Callable
+
+from hatch_pyz.compression import CHUNK_SIZE
+
+# raised by `copy_file_range` and `sendfile` where the kernel, file system or sandbox does not support them
+UNSUPPORTED_COPY_ERRORS = {
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.ENOTSOCK,
+    errno.EPERM,
+    errno.EXDEV,
+}
+
+
+def get_checksums(in_file: IO[bytes], size: int, *, digest: bool = False) -> tuple[int, str | None]:
+    """
+    Compute the CRC-32 and, with `digest`, the SHA-256 of the first `size` bytes of a file, mapping it into memory
+    instead of reading it in chunks where possible.
+    """
+    hasher = hashlib.sha256() if digest else None
+    if not size:
+        return 0, hasher.hexdigest() if hasher else None
+
+    try:
+        data = mmap.mmap(in_file.fileno(), size, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # special files cannot be mapped, and files that shrank since they were scanned are handled by the copy
+        crc = 0
+        in_file.seek(0)
+        for chunk in iter(lambda: in_file.read(CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+            if hasher:
+                hasher.update(chunk)
+        return crc, hasher.hexdigest() if hasher else None
+
+    with data:
+        if hasher:
+            hasher.update(data)
+        return zlib.crc32(data), hasher.hexdigest() if hasher else None
+
+
+def copy_file_range(in_fd: int, out_fd: int, offset: int, out_offset: int, count: int) -> int:
+    return os.copy_file_range(in_fd, out_fd, count, offset, out_offset)
+
+
+def sendfile(in_fd: int, out_fd: int, offset: int, out_offset: int, count: int) -> int:
+    # writes at, and advances, the current position of `out_fd`
+    os.lseek(out_fd, out_offset, os.SEEK_SET)
+    return os.sendfile(out_fd, in_fd, offset, count)
+
+
+def get_copy_functions() -> list[Callable[[int, int, int, int, int], int]]:
+    functions: list[Callable[[int, int, int, int, int], int]] = []
+    if hasattr(os, "copy_file_range"):
+        functions.append(copy_file_range)
+    if hasattr(os, "sendfile"):
+        functions.append(sendfile)
+    return functions
+
+
+def copy_data(in_file: IO[bytes], out_file: IO[bytes], size: int) -> int:
+    """
+    Copy the first `size` bytes of `in_file` to the current position of `out_file`, leaving it after them, and
+    return how many bytes were copied, which is less than `size` only if `in_file` is shorter.
+
+    The data is moved by the kernel with `copy_file_range`, or else `sendfile`, without passing through Python; where
+    neither is available or supported, it is read and written in chunks.
+    """
+    out_file.flush()
+    in_fd, out_fd = in_file.fileno(), out_file.fileno()
+    start = out_file.tell()
+    copied = 0
+
+    for copy in get_copy_functions():
+        try:
+            while copied < size:
+                count = copy(in_fd, out_fd, copied, start + copied, size - copied)
+                if not count:
+                    break
+                copied += count
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_COPY_ERRORS:
+                raise
+            continue
+        break
+    else:
+        in_file.seek(copied)
+        out_file.seek(start + copied)
+        while copied < size:
+            chunk = in_file.read(min(CHUNK_SIZE, size - copied))
+            if not chunk:
+                break
+            out_file.write(chunk)
+            copied += len(chunk)
+
+    out_file.seek(start + copied)
+    return copied
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING, Callable
+from zipfile import ZipFile
+
+from hatchling.builders.utils import normalize_archive_path
+
+from hatch_pyz.fingerprint import get_fingerprint_path
+from hatch_pyz.incremental import get_manifest_path
+from hatch_pyz.report import get_report_path
+from hatch_pyz.scan import ScannedFile, scan_file
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from zipfile import ZipInfo
+
+    from hatch_pyz.builder import PythonZipappBuilder
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_COMPACT_THRESHOLD = 0.5
+
+
+def get_entry_sizes(entries: Iterable[ZipInfo], end: int) -> dict[str, int]:
+    """
+    Return the bytes each entry takes up in the archive, its local header and data, given where the last one ends.
+    """
+    ordered = sorted(entries, key=lambda zip_info: zip_info.header_offset)
+    ends = [*(zip_info.header_offset for zip_info in ordered[1:]), end]
+    return {zip_info.filename: entry_end - zip_info.header_offset for zip_info, entry_end in zip(ordered, ends)}
+
+
+def is_modified(old: os.stat_result, new: os.stat_result) -> bool:
+    return (old.st_mtime_ns, old.st_size, old.st_mode) != (new.st_mtime_ns, new.st_size, new.st_mode)
+
+
+class Watcher:
+    """
+    Keeps an artifact up to date with the project files it is built from.
+
+    Changed files are appended to the existing archive and its central directory is rewritten, leaving the data of the
+    entries they replace behind as wasted space. Once that exceeds `compact_threshold` of the archive, and when
+    watching stops, the artifact is compacted by building it again from scratch, which produces exactly what a clean
+    build would.
+
+    Changes to `pyproject.toml` always trigger a new build, as does any change when the target uses an option whose
+    entries depend on the rest of the archive: `extract`, `layered`, `compile-bytecode`, `matrix` or
+    `mapped-resources`.
+    """
+
+    def __init__(
+        self,
+        get_builder: Callable[[], PythonZipappBuilder],
+        directory: str,
+        *,
+        compact_threshold: float = DEFAULT_COMPACT_THRESHOLD,
+    ):
+        self.get_builder = get_builder
+        self.directory = directory
+        self.compact_threshold = compact_threshold
+        self.build()
+
+    def build(self) -> None:
+        self.builder = self.get_builder()
+        self.project_stat = self.get_project_stat()
+        # scanned before building, so that files changed during the build are picked up by the next poll
+        self.files = self.scan()
+        self.target = self.builder.build_standard(self.directory)
+        with ZipFile(self.target) as zf:
+            self.sizes = get_entry_sizes(zf.infolist(), zf.start_dir)
+        self.wasted = 0
+        # whether the archive was updated in place since it was built
+        self.updated = False
+
+    def get_project_stat(self) -> tuple[int, int] | None:
+        try:
+            project_stat = os.stat(os.path.join(self.builder.root, "pyproject.toml"))
+        except OSError:
+            return None
+        return project_stat.st_mtime_ns, project_stat.st_size
+
+    def scan(self) -> dict[str, ScannedFile]:
+        return {
+            normalize_archive_path(included_file.distribution_path): scan_file(included_file)
+            for included_file in self.builder.recurse_included_files()
+        }
+
+    @property
+    def updates_in_place(self) -> bool:
+        config = self.builder.config
+        return not (
+            config.extract or config.layered or config.compile_bytecode or config.matrix or config.mapped_resources
+        )
+
+    def poll(self) -> bool:
+        """
+        Bring the artifact up to date with the changes made since the last poll, returning whether there were any.
+        """
+        if self.get_project_stat() != self.project_stat:
+            self.build()
+            return True
+
+        files = self.scan()
+        changed = [
+            arcname
+            for arcname, scanned_file in files.items()
+            if arcname not in self.files or is_modified(self.files[arcname].stat, scanned_file.stat)
+        ]
+        removed = [arcname for arcname in self.files if arcname not in files]
+        if not changed and not removed:
+            return False
+
+        if not self.updates_in_place:
+            self.build()
+            return True
+
+        self.update([files[arcname] for arcname in changed], removed)
+        self.files = files
+        if self.wasted > self.compact_threshold * os.path.getsize(self.target):
+            self.build()
+        return True
+
+    def update(self, changed: list[ScannedFile], removed: list[str]) -> None:
+        """
+        Replace the entries of the changed files and drop those of removed files, in place.
+        """
+        # they describe the archive as it was built
+        for path in (get_manifest_path(self.target), get_report_path(self.target), get_fingerprint_path(self.target)):
+            if os.path.exists(path):
+                os.remove(path)
+
+        with self.builder.get_archive(existing=self.target) as pyzapp:
+            for arcname in (*removed, *(normalize_archive_path(file.distribution_path) for file in changed)):
+                if arcname in pyzapp.zf.NameToInfo:
+                    pyzapp.remove_entry(arcname)
+                    self.wasted += self.sizes.pop(arcname)
+
+            # the same way a full build adds them, so that compression rules and automatic storing apply
+            pyzapp.add_files(changed)
+            # the changed entries were appended one after another at the end of the archive
+            entries = [pyzapp.zf.NameToInfo[normalize_archive_path(file.distribution_path)] for file in changed]
+            self.sizes.update(get_entry_sizes(entries, pyzapp.zf.start_dir))
+        self.updated = True
+
+    def compact(self) -> None:
+        if self.updated:
+            self.build()
+
+    def run(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """
+        Poll for changes every `interval` seconds until interrupted, then compact the artifact.
+        """
+        app = self.builder.app
+        app.display_info(f"Watching {self.builder.root} for changes to {os.path.basename(self.target)}")
+        try:
+            while True:
+                time.sleep(interval)
+                start = time.perf_counter()
+                if self.poll():
+                    app.display_info(f"Updated {os.path.basename(self.target)} in {time.perf_counter() - start:.2f}s")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.compact()
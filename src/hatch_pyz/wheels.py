@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import re
+import zipfile
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# `<name>-<version>.data/<scheme>/...` members, of which only the library schemes are importable
+WHEEL_DATA_PATTERN = re.compile(r"^[^/]+\.data/(?P<scheme>[^/]+)/(?P<path>.+)$")
+WHEEL_LIBRARY_SCHEMES = {"purelib", "platlib"}
+
+
+class WheelMember(NamedTuple):
+    wheel: zipfile.ZipFile
+    zip_info: zipfile.ZipInfo
+    arcname: str
+    distribution: str
+
+
+def get_wheel_distribution(filename: str) -> str:
+    # https://packaging.python.org/en/latest/specifications/binary-distribution-format/#file-name-convention
+    return os.path.basename(filename).split("-", 1)[0]
+
+
+def get_install_path(name: str) -> str | None:
+    """
+    Return where `pip install --target` would put a wheel member, relative to the target directory, or None for
+    members that are not installed next to the importable code, such as scripts and headers.
+    """
+    match = WHEEL_DATA_PATTERN.match(name)
+    if match is None:
+        return name
+    if match.group("scheme") in WHEEL_LIBRARY_SCHEMES:
+        return match.group("path")
+    return None
+
+
+class WheelArchives:
+    """
+    The wheels of every dependency, opened for reading their members without unpacking them.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.wheels = [zipfile.ZipFile(path) for path in sorted(paths, key=os.path.basename)]
+
+    def members(self) -> Iterator[WheelMember]:
+        """
+        Yield every installable file in wheel and member order. As with pip, a path provided by several wheels, such as
+        the `__init__.py` of a shared package, is only installed once.
+        """
+        seen = set()
+        for wheel in self.wheels:
+            assert wheel.filename is not None
+            distribution = get_wheel_distribution(wheel.filename)
+            for zip_info in wheel.infolist():
+                if zip_info.is_dir():
+                    continue
+                arcname = get_install_path(zip_info.filename)
+                if arcname is None or arcname in seen:
+                    continue
+                seen.add(arcname)
+                yield WheelMember(wheel, zip_info, arcname, distribution)
+
+    def close(self) -> None:
+        for wheel in self.wheels:
+            wheel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+
+class BenchmarkResults:
+    """
+    Collects benchmark metrics, where lower is always better, and optionally checks them against a baseline.
+    """
+
+    def __init__(self, baseline: dict[str, dict[str, float]] | None, max_regression: float):
+        self.results: dict[str, dict[str, float | None]] = {}
+        self.baseline = baseline or {}
+        self.max_regression = max_regression
+
+    def record(self, name: str, **metrics: float | None) -> None:
+        self.results[name] = metrics
+
+        regressions = []
+        for metric, value in metrics.items():
+            previous = self.baseline.get(name, {}).get(metric)
+            if value is not None and previous and value > previous * (1 + self.max_regression):
+                regressions.append(f"{metric}: {previous:.4g} -> {value:.4g} (+{value / previous - 1:.0%})")
+
+        if regressions:
+            pytest.fail(f"Benchmark `{name}` regressed against the baseline:\n" + "\n".join(regressions))
+
+    def to_dict(self) -> dict[str, Any]:
+        try:
+            revision = subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            revision = None
+
+        return {
+            "revision": revision,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": self.results,
+        }
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    baseline = None
+    baseline_path = request.config.getoption("--benchmark-baseline")
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text())["results"]
+
+    results = BenchmarkResults(baseline, request.config.getoption("--benchmark-max-regression"))
+    yield results
+
+    results_path = request.config.getoption("--benchmark-results")
+    if results_path:
+        Path(results_path).write_text(json.dumps(results.to_dict(), indent=2, sort_keys=True))
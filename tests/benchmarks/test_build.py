@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+import hatch_pyz.builder
+from tests.benchmarks.utils import (
+    make_fake_dependencies,
+    make_fake_pip_install,
+    make_synthetic_project,
+    measure_cold_start,
+    run_measured,
+)
+
+if TYPE_CHECKING:
+    from hatch_pyz.builder import PythonZipappBuilder
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize(
+    ("file_count", "dependency_count", "files_per_dependency"),
+    [
+        pytest.param(10, 0, 0, id="10-files"),
+        pytest.param(1_000, 0, 0, id="1k-files"),
+        pytest.param(10_000, 0, 0, id="10k-files"),
+        pytest.param(50_000, 0, 0, id="50k-files"),
+        pytest.param(1_000, 20, 500, id="1k-files-10k-dependency-files"),
+    ],
+)
+@pytest.mark.parametrize("jobs", [pytest.param(1, id="serial"), pytest.param(0, id="parallel")])
+def test_build(
+    file_count, dependency_count, files_per_dependency, jobs, pyz_builder_factory, benchmark_results, tmp_path
+):
+    dependencies = [f"dependency_{i}" for i in range(dependency_count)]
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=dependencies, jobs=jobs, reproducible=True)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    make_synthetic_project(Path(builder.root), file_count)
+
+    make_fake_dependencies(tmp_path, dependency_count, files_per_dependency)
+    fake_pip_install = make_fake_pip_install(tmp_path)
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install):
+        artifact, build_time, peak_rss = run_measured(lambda: builder.build_standard(str(build_dir)))
+
+    benchmark_results.record(
+        f"build[files={file_count},dependencies={dependency_count}x{files_per_dependency},jobs={jobs}]",
+        build_time=build_time,
+        peak_rss=peak_rss,
+        archive_size=Path(artifact).stat().st_size,
+        cold_start=measure_cold_start(artifact),
+    )
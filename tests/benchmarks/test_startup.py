@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from hatch_pyz.launcher import get_launcher_command
+from tests.benchmarks.utils import make_project_config, measure_cold_start
+
+if TYPE_CHECKING:
+    from hatch_pyz.builder import PythonZipappBuilder
+
+pytestmark = pytest.mark.benchmark
+
+MODULE_COUNT = 200
+RUNS = 15
+
+MODULE_TEMPLATE = '''\
+"""Synthetic module {index}."""
+import dataclasses
+
+
+@dataclasses.dataclass
+class Record{index}:
+    name: str
+    value: int = {index}
+
+    def describe(self) -> str:
+        return f"{{self.name}}={{self.value}}"
+
+''' + "\n".join(
+    f"def function_{n}(x, y={n}):\n    if x > y:\n        return [i * y for i in range(x)]\n    return (x, y)\n"
+    for n in range(40)
+)
+
+
+def make_synthetic_app(root: Path) -> None:
+    package = root / "src" / "my_app"
+    for index in range(MODULE_COUNT):
+        (package / f"module_{index}.py").write_text(MODULE_TEMPLATE.format(index=index))
+    imports = "\n".join(f"from my_app import module_{index}" for index in range(MODULE_COUNT))
+    (package / "app.py").write_text(f"{imports}\n\n\ndef main():\n    pass\n")
+
+
+def test_startup_bytecode(pyz_builder_factory, benchmark_results):
+    variants = {
+        "source": {},
+        "bytecode": {"compile-bytecode": True},
+        "sourceless": {"compile-bytecode": True, "sourceless": True},
+    }
+
+    results = {}
+    for name, build_conf in variants.items():
+        builder: PythonZipappBuilder = pyz_builder_factory(config=make_project_config(**build_conf))
+        build_dir = Path(builder.config.directory)
+        build_dir.mkdir()
+        make_synthetic_app(Path(builder.root))
+
+        artifact = builder.build_standard(str(build_dir))
+        results[name] = (measure_cold_start(artifact, RUNS), Path(artifact).stat().st_size)
+        benchmark_results.record(f"startup[{name}]", cold_start=results[name][0], archive_size=results[name][1])
+
+    lines = [f"{'variant':<12}{'startup (ms)':>14}{'size (KiB)':>12}"]
+    lines.extend(f"{name:<12}{startup * 1000:>14.1f}{size / 1024:>12.1f}" for name, (startup, size) in results.items())
+    print("\n" + "\n".join(lines))
+
+    assert results["bytecode"][0] < results["source"][0]
+
+
+def test_startup_launcher(pyz_builder_factory, benchmark_results):
+    variants = {
+        "default": {},
+        "isolated": {"interpreter-flags": ["-I"]},
+        "no-site": {"interpreter-flags": ["-S"]},
+        "sys-path": {"interpreter-flags": ["-S"], "precompute-sys-path": True},
+        "lazy": {"lazy-imports": True},
+        "all": {"interpreter-flags": ["-IS"], "precompute-sys-path": True, "lazy-imports": True},
+    }
+
+    results = {}
+    for name, build_conf in variants.items():
+        # with bytecode, so that compiling the modules does not drown out the launcher
+        config = make_project_config(
+            interpreter=sys.executable, validate=True, **{"compile-bytecode": True, **build_conf}
+        )
+        builder: PythonZipappBuilder = pyz_builder_factory(config=config)
+        build_dir = Path(builder.config.directory)
+        build_dir.mkdir()
+        make_synthetic_app(Path(builder.root))
+
+        artifact = builder.build_standard(str(build_dir))
+        # run as the shebang line would, with the variant's flags
+        command = get_launcher_command(builder.config.interpreter, builder.config.interpreter_flags)
+        results[name] = measure_cold_start(artifact, RUNS, command)
+        benchmark_results.record(f"startup-launcher[{name}]", cold_start=results[name])
+
+    lines = [f"{'variant':<12}{'startup (ms)':>14}"]
+    lines.extend(f"{name:<12}{startup * 1000:>14.1f}" for name, startup in results.items())
+    print("\n" + "\n".join(lines))
+
+    # none of the 200 modules the entry point imports is used
+    assert results["lazy"] < results["default"]
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import math
+import multiprocessing
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+CODE_TEMPLATE = '''\
+def {name}(value, factor={n}):
+    """Return a scaled copy of `value`."""
+    if isinstance(value, dict):
+        return {{key: {name}(item, factor) for key, item in value.items()}}
+    result = []
+    for index in range(factor):
+        result.append((index, value * factor))
+    return result
+
+
+class {cls}:
+    limit = {n}
+
+    def __init__(self, name):
+        self.name = name
+        self.items = []
+
+    def add(self, item):
+        if len(self.items) >= self.limit:
+            raise ValueError("{cls} is full")
+        self.items.append(item)
+
+'''
+
+# Median sizes of a typical Python module and a data file, in bytes
+MODULE_SIZE = 3000
+DATA_SIZE = 20000
+
+
+def make_module_source(rng: random.Random, size: int) -> str:
+    chunks: list[str] = []
+    length = 0
+    while length < size:
+        n = rng.randrange(1000)
+        chunk = CODE_TEMPLATE.format(name=f"transform_{n}_{len(chunks)}", cls=f"Registry{n}x{len(chunks)}", n=n)
+        chunks.append(chunk)
+        length += len(chunk)
+    return "".join(chunks)
+
+
+def make_data(rng: random.Random, size: int) -> bytes:
+    # half text-like and compressible, half random like images or archives
+    if rng.random() < 0.5:
+        return json.dumps([{"id": i, "name": f"item-{i}"} for i in range(size // 30)]).encode()
+    return rng.randbytes(size) if hasattr(rng, "randbytes") else bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def make_tree(root: Path, file_count: int, *, seed: int = 0, data_ratio: float = 0.1) -> list[str]:
+    """
+    Fill `root` with `file_count` files spread over packages of 100 files, with log-normally distributed sizes.
+    Returns the names of the generated packages.
+    """
+    rng = random.Random(seed)
+    packages = []
+    for index in range(file_count):
+        package = root / f"package_{index // 100}"
+        if index % 100 == 0:
+            package.mkdir(parents=True, exist_ok=True)
+            (package / "__init__.py").write_text(f'"""Package {package.name}."""\n')
+            packages.append(package.name)
+            continue
+
+        if rng.random() < data_ratio:
+            size = min(int(rng.lognormvariate(math.log(DATA_SIZE), 1.0)), 2_000_000)
+            (package / f"data_{index}.bin").write_bytes(make_data(rng, size))
+        else:
+            size = min(int(rng.lognormvariate(math.log(MODULE_SIZE), 1.0)), 200_000)
+            (package / f"module_{index}.py").write_text(make_module_source(rng, size))
+    return packages
+
+
+def make_project_config(**build_conf: Any) -> dict[str, Any]:
+    """
+    Return a new project configuration for `pyz_builder_factory` with the `pyz` target options `build_conf`. The
+    factory updates the configuration it is given, so every measured variant gets its own rather than the shared
+    default, which would carry options over from the variants built before it.
+    """
+    return {
+        "project": {"name": "my-app", "version": "0.0.1"},
+        "tool": {"hatch": {"build": {"targets": {"pyz": {"main": "my_app.app:main", **build_conf}}}}},
+    }
+
+
+def make_synthetic_project(root: Path, file_count: int, *, seed: int = 0) -> None:
+    """
+    Replace the `my_app` package of a project created by `pyz_builder_factory` with `file_count` generated files.
+    The entry point imports one module from each of the first ten subpackages.
+    """
+    package = root / "src" / "my_app"
+    packages = make_tree(package, max(file_count - 2, 1), seed=seed)
+    imports = "\n".join(f"from my_app.{name} import __name__ as _{name}" for name in packages[:10])
+    (package / "__init__.py").write_text("")
+    (package / "app.py").write_text(f"{imports}\n\n\ndef main():\n    pass\n")
+
+
+def make_fake_dependencies(directory: Path, package_count: int, files_per_package: int) -> None:
+    """
+    Generate an installed dependency tree as `pip install --target` would leave it.
+    """
+    for index in range(package_count):
+        name = f"dependency_{index}"
+        make_tree(directory / name, files_per_package, seed=index + 1)
+        dist_info = directory / f"{name}-1.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+        (dist_info / "top_level.txt").write_text(f"{name}\n")
+
+
+def make_fake_pip_install(source_directory: Path) -> Callable[[Any, str], None]:
+    """
+    Build a replacement for `hatch_pyz.builder.pip_install` that copies a pre-generated dependency tree, so that
+    generating the tree is not measured as part of the build.
+    """
+
+    def _pip_install(dependencies: Any, target_directory: str) -> None:
+        shutil.copytree(source_directory, target_directory, dirs_exist_ok=True)
+
+    return _pip_install
+
+
+def measure_cold_start(artifact: str, runs: int = 5, command: list[str] | None = None) -> float:
+    """
+    Return the median wall time of running the artifact with `command`, by default the running interpreter.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([*(command or [sys.executable]), artifact])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def get_peak_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes everywhere but macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_child(func: Callable[[], Any], connection: Any) -> None:
+    start = time.perf_counter()
+    result = func()
+    connection.send((result, time.perf_counter() - start, get_peak_rss()))
+    connection.close()
+
+
+def run_measured(func: Callable[[], Any]) -> tuple[Any, float, int | None]:
+    """
+    Run `func` and return its result, wall time and the peak RSS of the process that ran it. Where `fork` is
+    available, `func` runs in a forked child so that the peak is not inflated by earlier benchmarks.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start, get_peak_rss()
+
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_child, args=(func, sender))
+    process.start()
+    sender.close()
+    try:
+        measurement = receiver.recv()
+    except EOFError:
+        measurement = None
+    process.join()
+    if measurement is None or process.exitcode != 0:
+        message = f"Benchmark process failed with exit code {process.exitcode}"
+        raise RuntimeError(message)
+    return measurement
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 import os
 import random
 import time
+import zipfile
 from typing import TYPE_CHECKING, Any, Callable
 
 import pytest
@@ -14,6 +17,23 @@ if TYPE_CHECKING:
     from pathlib import Path
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "hatch-pyz benchmarks (run with `-m benchmark`)")
+    group.addoption("--benchmark-results", metavar="PATH", help="Write benchmark results to this JSON file")
+    group.addoption(
+        "--benchmark-baseline",
+        metavar="PATH",
+        help="Fail benchmarks that regress against results previously written with --benchmark-results",
+    )
+    group.addoption(
+        "--benchmark-max-regression",
+        type=float,
+        default=0.25,
+        metavar="FRACTION",
+        help="Largest tolerated slowdown or growth against the baseline (default: 0.25)",
+    )
+
+
 def random_file_time_tuple() -> tuple[int, int]:
     current_time = time.time()
     ten_years_ago = current_time - (10 * 365 * 24 * 3600)
@@ -30,6 +50,32 @@ def make_files(root: Path, files: list[str]) -> None:
         os.utime(path, random_file_time_tuple())  # randomize access and modification timestamps to test reproducibility
 
 
+def make_wheel(directory: Path, name: str, version: str, requires: list[str] | None = None) -> Path:
+    """
+    Write a minimal pure-Python wheel providing a package named after the distribution.
+    """
+    dist_info = f"{name}-{version}.dist-info"
+    files = {
+        f"{name}/__init__.py": f"VERSION = {version!r}\n",
+        f"{dist_info}/METADATA": "".join(
+            [f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"]
+            + [f"Requires-Dist: {requirement}\n" for requirement in requires or []]
+        ),
+        f"{dist_info}/WHEEL": "Wheel-Version: 1.0\nGenerator: tests\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = []
+    for filename, content in files.items():
+        digest = base64.urlsafe_b64encode(hashlib.sha256(content.encode()).digest()).rstrip(b"=").decode()
+        record.append(f"{filename},sha256={digest},{len(content)}\n")
+    files[f"{dist_info}/RECORD"] = "".join([*record, f"{dist_info}/RECORD,,\n"])
+
+    path = directory / f"{name}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as wheel:
+        for filename, content in files.items():
+            wheel.writestr(filename, content)
+    return path
+
+
 @pytest.fixture
 def pyz_builder_factory(tmp_path_factory) -> Callable:
     default_config: dict[str, Any] = {
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from hatch_pyz.cache import DependencyCache, normalize_requirements
+
+
+def populate(size: int):
+    def _populate(directory: str) -> None:
+        Path(directory, "module.py").write_bytes(b"x" * size)
+
+    return _populate
+
+
+def test_normalize_requirements():
+    assert normalize_requirements(["Flask_SocketIO>=5", "jinja2", "flask-socketio>=5"]) == [
+        "flask-socketio>=5",
+        "jinja2",
+    ]
+
+
+def test_get_key():
+    assert DependencyCache.get_key(["Jinja2", "flask"]) == DependencyCache.get_key(["flask", "jinja2"])
+    assert DependencyCache.get_key(["flask"]) != DependencyCache.get_key(["flask<3"])
+
+
+def test_get_and_add(tmp_path):
+    cache = DependencyCache(str(tmp_path))
+
+    assert cache.get("key") is None
+    path = cache.add("key", populate(0))
+    assert cache.get("key") == path
+    assert os.path.isfile(os.path.join(path, "module.py"))
+    assert [key for key, _, _ in cache.entries()] == ["key"]
+
+
+def test_add_failure_leaves_no_entry(tmp_path):
+    cache = DependencyCache(str(tmp_path))
+
+    def _populate(directory: str) -> None:
+        raise RuntimeError
+
+    try:
+        cache.add("key", _populate)
+    except RuntimeError:
+        pass
+
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = DependencyCache(str(tmp_path), max_size=250)
+    for i, key in enumerate(("a", "b")):
+        cache.add(key, populate(100))
+        os.utime(tmp_path / f"{key}.json", (i, i))
+
+    # using `a` makes `b` the least recently used entry
+    cache.get("a")
+    cache.add("c", populate(100))
+
+    assert [key for key, _, _ in cache.entries()] == ["a", "c"]
+    assert not (tmp_path / "b").exists()
+
+
+def test_prune(tmp_path):
+    cache = DependencyCache(str(tmp_path))
+    for key in ("a", "b", "c"):
+        cache.add(key, populate(1))
+
+    cache.prune(keep="b")
+
+    assert [key for key, _, _ in cache.entries()] == ["b"]
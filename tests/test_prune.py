@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from hatch_pyz.prune import find_imports, get_module_name
+
+
+@pytest.mark.parametrize(
+    ("path", "module"),
+    [
+        ("six.py", ("six", False)),
+        ("flask/__init__.py", ("flask", True)),
+        ("flask/json/provider.py", ("flask.json.provider", False)),
+        ("markupsafe/_speedups.cpython-312-x86_64-linux-gnu.so", ("markupsafe._speedups", False)),
+        ("flask/static/style.css", None),
+        ("flask-3.0.dist-info/license.py", None),
+    ],
+)
+def test_get_module_name(path, module):
+    assert get_module_name(path) == module
+
+
+def test_find_imports():
+    source = b"""\
+import os.path
+from . import sibling
+from ..parent import name
+from .sub import *
+import importlib
+try:
+    import simplejson as json
+except ImportError:
+    json = importlib.import_module("json")
+"""
+    assert find_imports(source, "package.module.child", is_package=False) == {
+        "os.path",
+        "package.module",
+        "package.module.sibling",
+        "package.parent",
+        "package.parent.name",
+        "package.module.sub",
+        "importlib",
+        "simplejson",
+        "json",
+    }
+    assert "package.module.child.sibling" in find_imports(source, "package.module.child", is_package=True)
+    assert find_imports(b"print 'python 2'", "legacy", is_package=False) == set()
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import zipfile
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -9,7 +16,11 @@ from unittest.mock import patch
 import pytest
 
 import hatch_pyz.builder
-from tests.conftest import make_files
+from hatch_pyz.cli import main
+from hatch_pyz.launcher import SysPath
+from hatch_pyz.lock import LockFile
+from hatch_pyz.watch import Watcher
+from tests.conftest import make_files, make_wheel
 
 if TYPE_CHECKING:
     from hatch_pyz.builder import PythonZipappBuilder
@@ -30,11 +41,14 @@ def test_clean(pyz_builder_factory):
     other_artifact.touch()
     zip_app = build_dir / "my-app.pyz"
     zip_app.touch()
+    fingerprint = build_dir / "my-app.pyz.fingerprint"
+    fingerprint.touch()
 
     builder.clean(str(build_dir), ["standard"])
 
     assert other_artifact.exists()
     assert not zip_app.exists()
+    assert not fingerprint.exists()
 
 
 def test_build_standard(pyz_builder_factory):
@@ -112,3 +126,1014 @@ def test_build_standard_bundled_dependencies(pyz_builder_factory):
             "flask-socketio",
             "jinja2",
         }
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_build_standard_parallel_matches_serial(compressed, pyz_builder_factory):
+    artifacts = []
+    for jobs in (1, 4):
+        builder: PythonZipappBuilder = pyz_builder_factory(reproducible=True, compressed=compressed, jobs=jobs)
+        build_dir = Path(builder.config.directory)
+        build_dir.mkdir()
+        for i, path in enumerate(sorted(Path(builder.root, "src", "my_app").iterdir())):
+            path.write_bytes(b"".join(b"%d line %d\n" % (i, n) for n in range(5000)))
+
+        artifacts.append(builder.build_standard(str(build_dir)))
+
+    assert md5_file_digest(artifacts[0]) == md5_file_digest(artifacts[1])
+    with zipfile.ZipFile(artifacts[1], "r") as zf:
+        assert zf.testzip() is None
+        assert zf.read("my_app/app.py").startswith(b"1 line 0\n")
+
+
+@pytest.mark.parametrize("jobs", [True, -1, "4"])
+def test_jobs_invalid(jobs, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(jobs=jobs)
+
+    with pytest.raises(TypeError, match="jobs` must be a non-negative integer"):
+        _ = builder.config.jobs
+
+
+@pytest.mark.parametrize(("cache_mode", "installs"), [("", 1), ("bypass", 2)])
+def test_build_standard_dependency_cache(cache_mode, installs, pyz_builder_factory, tmp_path, monkeypatch):
+    monkeypatch.setenv("HATCH_PYZ_DEPENDENCY_CACHE", cache_mode)
+    dependencies = ["flask", "jinja2"]
+
+    with patch.object(hatch_pyz.builder, "pip_install") as mock_pip_install:
+        mock_pip_install.side_effect = lambda deps, target_dir: make_files(Path(target_dir), deps)
+        for _ in range(2):
+            builder: PythonZipappBuilder = pyz_builder_factory(
+                dependencies=dependencies,
+                **{"dependency-cache": True, "dependency-cache-dir": str(tmp_path / "cache")},
+            )
+            build_dir = Path(builder.config.directory)
+            build_dir.mkdir()
+            artifact_path = builder.build_standard(str(build_dir))
+
+            with zipfile.ZipFile(artifact_path, "r") as zf:
+                assert {"flask", "jinja2"} <= set(zf.namelist())
+
+    assert mock_pip_install.call_count == installs
+
+
+def test_build_standard_dependency_cache_prune(pyz_builder_factory, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    with patch.object(hatch_pyz.builder, "pip_install") as mock_pip_install:
+        mock_pip_install.side_effect = lambda deps, target_dir: make_files(Path(target_dir), deps)
+        for dependencies in (["flask"], ["jinja2"]):
+            builder: PythonZipappBuilder = pyz_builder_factory(
+                dependencies=dependencies, **{"dependency-cache": True, "dependency-cache-dir": str(cache_dir)}
+            )
+            build_dir = Path(builder.config.directory)
+            build_dir.mkdir()
+            builder.build_standard(str(build_dir))
+            monkeypatch.setenv("HATCH_PYZ_DEPENDENCY_CACHE", "prune")
+
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+
+@pytest.mark.parametrize("reproducible", [False, True])
+def test_build_standard_incremental(reproducible, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(reproducible=reproducible, incremental=True)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    package = Path(builder.root, "src", "my_app")
+    for path in package.iterdir():
+        path.write_bytes(path.name.encode() * 1000)
+
+    artifact_path = builder.build_standard(str(build_dir))
+    assert Path(f"{artifact_path}.manifest.json").is_file()
+
+    (package / "app.py").write_bytes(b"def main(): pass\n")
+    # a touched file is only recompressed when its timestamp ends up in the archive
+    os.utime(package / "logger.py", (946684800, 946684800))
+    with patch.object(hatch_pyz.builder, "compress_file", wraps=hatch_pyz.builder.compress_file) as mock_compress:
+        artifact_path = builder.build_standard(str(build_dir))
+
+    assert [call.args[0] for call in mock_compress.call_args_list] == [str(package / "app.py")] + (
+        [] if reproducible else [str(package / "logger.py")]
+    )
+    incremental_digest = md5_file_digest(artifact_path)
+    with zipfile.ZipFile(artifact_path, "r") as zf:
+        assert zf.testzip() is None
+        assert zf.read("my_app/app.py") == b"def main(): pass\n"
+        assert zf.read("my_app/__init__.py") == b"__init__.py" * 1000
+
+    # a clean build produces the same archive
+    os.remove(f"{artifact_path}.manifest.json")
+    assert md5_file_digest(builder.build_standard(str(build_dir))) == incremental_digest
+
+
+def test_clean_incremental_manifest(pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(incremental=True)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    builder.build_standard(str(build_dir))
+    builder.clean(str(build_dir), ["standard"])
+
+    assert list(build_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("sourceless", [False, True])
+def test_build_standard_compile_bytecode(sourceless, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(**{"compile-bytecode": True, "sourceless": sourceless})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_text("def main():\n    print(__file__)\n")
+
+    artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path, "r") as zf:
+        names = set(zf.namelist())
+    expected = {"__main__.py", "my_app/__init__.pyc", "my_app/app.pyc", "my_app/logger.pyc"}
+    if not sourceless:
+        expected |= {"my_app/__init__.py", "my_app/app.py", "my_app/logger.py"}
+    assert names == expected
+
+    output = subprocess.check_output([sys.executable, artifact_path], text=True)
+    assert output.strip().endswith("app.pyc")
+
+
+def test_build_standard_compile_bytecode_interpreter(pyz_builder_factory):
+    artifacts = []
+    for bytecode_interpreter in (None, sys.executable):
+        build_conf: dict = {"compile-bytecode": True, "optimize": 2, "reproducible": True}
+        if bytecode_interpreter:
+            build_conf["bytecode-interpreter"] = bytecode_interpreter
+        builder: PythonZipappBuilder = pyz_builder_factory(**build_conf)
+        build_dir = Path(builder.config.directory)
+        build_dir.mkdir()
+        Path(builder.root, "src", "my_app", "app.py").write_text('def main():\n    """doc"""\n    assert False\n')
+        Path(builder.root, "src", "my_app", "logger.py").write_text("print 'python 2'\n")
+
+        artifacts.append(builder.build_standard(str(build_dir)))
+
+    assert md5_file_digest(artifacts[0]) == md5_file_digest(artifacts[1])
+    with zipfile.ZipFile(artifacts[0], "r") as zf:
+        # sources that fail to compile are shipped as-is
+        assert "my_app/logger.pyc" not in zf.namelist()
+    # -OO strips asserts from the compiled entry point
+    subprocess.check_call([sys.executable, artifacts[0]])
+
+
+def test_sourceless_requires_bytecode(pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(sourceless=True)
+
+    with pytest.raises(ValueError, match="require `compile-bytecode`"):
+        _ = builder.config.sourceless
+
+
+def test_build_standard_extract(pyz_builder_factory, tmp_path):
+    builder: PythonZipappBuilder = pyz_builder_factory(extract=True, reproducible=True)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_text("def main():\n    print(__file__)\n")
+
+    artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path, "r") as zf:
+        assert zf.namelist()[-1] == "__main__.py"
+        assert {"_hatch_pyz/__init__.py", "_hatch_pyz/extract.py"} <= set(zf.namelist())
+
+    root = tmp_path / "extracted"
+    env = {**os.environ, "HATCH_PYZ_ROOT": str(root)}
+    # concurrent first runs must all succeed against a single extraction
+    processes = [
+        subprocess.Popen([sys.executable, artifact_path], env=env, stdout=subprocess.PIPE, text=True) for _ in range(4)
+    ]
+    outputs = {process.communicate()[0].strip() for process in processes}
+    assert all(process.returncode == 0 for process in processes)
+
+    (extracted,) = (path for path in root.iterdir() if path.is_dir())
+    assert extracted.name.startswith("my_app-0.0.1_")
+    assert outputs == {str(extracted / "my_app" / "app.py")}
+    assert not (extracted / "__main__.py").exists()
+
+
+@pytest.mark.parametrize("extract", [False, True])
+def test_build_standard_import_profiling(extract, pyz_builder_factory, tmp_path):
+    builder: PythonZipappBuilder = pyz_builder_factory(extract=extract, **{"import-profiling": True})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_text("import my_app.logger\n\n\ndef main():\n    pass\n")
+
+    artifact_path = builder.build_standard(str(build_dir))
+    env = {**os.environ, "HATCH_PYZ_ROOT": str(tmp_path / "extracted")}
+
+    result = subprocess.run([sys.executable, artifact_path], env=env, capture_output=True, text=True, check=True)
+    assert not result.stderr
+
+    env["HATCH_PYZ_IMPORT_PROFILE"] = "1"
+    result = subprocess.run([sys.executable, artifact_path], env=env, capture_output=True, text=True, check=True)
+    assert "hatch-pyz import profile" in result.stderr
+    assert "\nmy_app " in result.stderr
+
+    profile_path = tmp_path / "profile.json"
+    env["HATCH_PYZ_IMPORT_PROFILE"] = str(profile_path)
+    subprocess.run([sys.executable, artifact_path], env=env, check=True)
+    profile = json.loads(profile_path.read_text())
+    modules = {module["name"]: module for module in profile["modules"]}
+    assert {"my_app", "my_app.app", "my_app.logger"} <= set(modules)
+    assert modules["my_app.logger"]["load"] > 0
+    assert modules["my_app.app"]["cumulative"] >= modules["my_app.logger"]["cumulative"]
+    assert profile["packages"]["my_app"]["modules"] == 3
+
+
+def test_build_standard_launcher(pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        interpreter=sys.executable,
+        validate=["--check"],
+        **{"interpreter-flags": ["-S"], "precompute-sys-path": True, "lazy-imports": True},
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "logger.py").write_text("raise RuntimeError('imported')\n")
+    Path(builder.root, "src", "my_app", "app.py").write_text(
+        "import json\nimport sys\n\nimport my_app.logger\n\n\n"
+        "def main():\n"
+        "    print(json.dumps({'argv': sys.argv[1:], 'no_site': sys.flags.no_site, 'path': sys.path}))\n"
+    )
+
+    artifact_path = builder.build_standard(str(build_dir))
+    with open(artifact_path, "rb") as f:
+        assert f.readline() == f"#!{sys.executable} -S\n".encode()
+
+    # the logger is never used, so it is never executed
+    result = json.loads(subprocess.check_output([sys.executable, "-S", artifact_path, "--run"], text=True))
+    assert result["argv"] == ["--run"]
+    assert result["no_site"] == 1
+    expected_path = json.loads(
+        subprocess.check_output([sys.executable, "-c", "import json, sys; print(json.dumps(sys.path))"], text=True)
+    )
+    assert result["path"][0] == artifact_path
+    assert result["path"][1:] == [path for path in expected_path[1:] if os.path.exists(path)]
+
+    builder = pyz_builder_factory(interpreter=sys.executable, validate=True, **{"lazy-imports": True})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "logger.py").write_text("raise RuntimeError('imported')\n")
+    Path(builder.root, "src", "my_app", "app.py").write_text(
+        "import my_app.logger\n\n\ndef main():\n    my_app.logger.log\n"
+    )
+    with pytest.raises(RuntimeError, match="(?s)Validation of my_app-0.0.1.pyz failed: .* status 1.*imported"):
+        builder.build_standard(str(build_dir))
+
+
+@pytest.mark.parametrize(
+    "flag",
+    [
+        "-I",
+        pytest.param("-P", marks=pytest.mark.skipif(sys.version_info < (3, 11), reason="-P was added in Python 3.11")),
+    ],
+)
+def test_build_standard_precompute_sys_path_safe_path(flag, pyz_builder_factory, tmp_path, monkeypatch):
+    # -I ignores PYTHONPATH while -P keeps it, so that the first entry of `sys.path` exists either way
+    python_path = tmp_path / "python-path"
+    python_path.mkdir()
+    monkeypatch.setenv("PYTHONPATH", str(python_path))
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        interpreter=sys.executable,
+        validate=False,
+        **{"interpreter-flags": [flag], "precompute-sys-path": True, "lazy-imports": False},
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_text(
+        "import json\nimport sys\n\n\ndef main():\n    print(json.dumps(sys.path))\n"
+    )
+
+    artifact_path = builder.build_standard(str(build_dir))
+    print_path = "import json, sys; print(json.dumps(sys.path))"
+    expected_path = json.loads(subprocess.check_output([sys.executable, flag, "-c", print_path], text=True))
+    result = json.loads(subprocess.check_output([sys.executable, flag, artifact_path], text=True))
+    assert result[0] == artifact_path
+    assert result[1:] == [os.path.abspath(path) for path in expected_path if os.path.exists(path)]
+    assert os.path.dirname(os.__file__) in result
+    assert (str(python_path) in result) is (flag == "-P")
+
+
+@pytest.mark.parametrize(
+    ("version", "prefix", "missing"),
+    [
+        ((2, 7), sys.prefix, False),
+        (sys.version_info[:2], "/other/venv", False),
+        (sys.version_info[:2], sys.prefix, True),
+    ],
+)
+def test_build_standard_precompute_sys_path_fallback(version, prefix, missing, pyz_builder_factory, tmp_path):
+    # the recorded path is a directory that exists, unless the artifact is meant to find one missing
+    recorded = tmp_path / "recorded"
+    if not missing:
+        recorded.mkdir()
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        interpreter=sys.executable,
+        validate=False,
+        **{"interpreter-flags": ["-S"], "precompute-sys-path": True, "lazy-imports": False},
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_text(
+        "import json\nimport sys\n\n\ndef main():\n    print(json.dumps(sys.path))\n"
+    )
+
+    with patch.object(hatch_pyz.builder, "get_sys_path", return_value=SysPath(version, prefix, [str(recorded)])):
+        artifact_path = builder.build_standard(str(build_dir))
+
+    # `site` is run instead, as if the interpreter had been started without `-S`
+    print_path = "import json, sys; print(json.dumps(sys.path))"
+    expected_path = json.loads(subprocess.check_output([sys.executable, "-c", print_path], text=True))
+    result = json.loads(subprocess.check_output([sys.executable, "-S", artifact_path], text=True))
+    assert result[0] == artifact_path
+    assert str(recorded) not in result
+    assert result[1:] == expected_path[1:]
+
+
+def test_build_standard_lazy_imports_profiling(pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(**{"lazy-imports": True, "import-profiling": True})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "logger.py").write_text("LEVEL = 'info'\n")
+    Path(builder.root, "src", "my_app", "app.py").write_text(
+        "import my_app.logger\n\n\ndef main():\n    print(my_app.logger.LEVEL)\n"
+    )
+
+    artifact_path = builder.build_standard(str(build_dir))
+    env = {**os.environ, "HATCH_PYZ_IMPORT_PROFILE": "1"}
+    result = subprocess.run([sys.executable, artifact_path], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout == "info\n"
+    assert "hatch-pyz import profile" in result.stderr
+
+
+@pytest.mark.parametrize("extract", [False, True])
+def test_build_standard_mapped_resources(extract, pyz_builder_factory, tmp_path):
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        extract=extract,
+        files=["src/my_app/__init__.py", "src/my_app/app.py", "src/my_app/data/model.bin", "src/my_app/data/notes.txt"],
+        **{"mapped-resources": True, "compression-rules": [{"pattern": "*.bin", "method": "stored"}]},
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    package = Path(builder.root, "src", "my_app")
+    model = os.urandom(100_000)
+    (package / "data" / "model.bin").write_bytes(model)
+    (package / "data" / "notes.txt").write_text("notes\n" * 1000)
+    (package / "app.py").write_text(
+        "import hashlib\nimport json\n\nfrom _hatch_pyz.resources import read_resource\n\n\n"
+        "def main():\n"
+        "    resources = {name: read_resource('my_app', 'data/' + name) for name in ('model.bin', 'notes.txt')}\n"
+        "    print(json.dumps({\n"
+        "        name: [type(data).__name__, hashlib.sha256(data).hexdigest()] for name, data in resources.items()\n"
+        "    }))\n"
+    )
+
+    artifact_path = builder.build_standard(str(build_dir))
+    with zipfile.ZipFile(artifact_path) as zf:
+        index = json.loads(zf.read("_hatch_pyz/resources.json")) if not extract else None
+        assert ("_hatch_pyz/resources.json" in zf.NameToInfo) is not extract
+        assert zf.getinfo("my_app/data/notes.txt").compress_type == zipfile.ZIP_DEFLATED
+    if index is not None:
+        assert list(index) == ["my_app/data/model.bin"]
+        _, data_offset, size = index["my_app/data/model.bin"]
+        with open(artifact_path, "rb") as f:
+            f.seek(data_offset)
+            assert f.read(size) == model
+
+    env = {**os.environ, "HATCH_PYZ_ROOT": str(tmp_path / "extracted")}
+    result = json.loads(subprocess.check_output([sys.executable, artifact_path], env=env, text=True))
+    assert result == {
+        "model.bin": ["bytes" if extract else "memoryview", hashlib.sha256(model).hexdigest()],
+        "notes.txt": ["bytes", hashlib.sha256(b"notes\n" * 1000).hexdigest()],
+    }
+
+
+@pytest.mark.parametrize(
+    ("interpreter", "flags", "shebang"),
+    [
+        ("/usr/bin/env python3", [], "/usr/bin/env python3"),
+        ("/usr/bin/env python3", ["-I"], "/usr/bin/env -S python3 -I"),
+        ("/usr/bin/env -S python3 -X dev", ["-s", "-E"], "/usr/bin/env -S python3 -X dev -s -E"),
+        ("/usr/bin/python3", ["-sE"], "/usr/bin/python3 -sE"),
+    ],
+)
+def test_shebang(interpreter, flags, shebang, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(interpreter=interpreter, **{"interpreter-flags": flags})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with open(builder.build_standard(str(build_dir)), "rb") as f:
+        assert f.readline() == f"#!{shebang}\n".encode()
+
+
+@pytest.mark.parametrize(
+    ("interpreter", "flags", "error"),
+    [
+        ("/usr/bin/env python3", "-S", "must be an array of strings"),
+        ("/usr/bin/env python3", ["S"], "must start with `-`"),
+        ("/usr/bin/env python3", ["-X dev"], "contain no whitespace"),
+        ("/usr/bin/python3", ["-s", "-E"], "must hold a single argument"),
+    ],
+)
+def test_interpreter_flags_invalid(interpreter, flags, error, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(interpreter=interpreter, **{"interpreter-flags": flags})
+
+    with pytest.raises((TypeError, ValueError), match=error):
+        _ = builder.config.interpreter_flags
+
+
+def test_build_standard_compression_rules(pyz_builder_factory):
+    rules = [
+        {"pattern": "*.png", "method": "stored"},
+        {"pattern": "my_app/app.py", "level": 9},
+    ]
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        files=["src/my_app/__init__.py", "src/my_app/app.py", "src/my_app/logo.png"],
+        **{"compression-rules": rules, "compression-level": 1},
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_bytes(b"def main(): pass\n" * 1000)
+    Path(builder.root, "src", "my_app", "__init__.py").write_bytes(b"def main(): pass\n" * 1000)
+
+    artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path, "r") as zf:
+        assert zf.getinfo("my_app/logo.png").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("my_app/app.py").compress_type == zipfile.ZIP_DEFLATED
+        # level 9 beats level 1 on the same content
+        assert zf.getinfo("my_app/app.py").compress_size < zf.getinfo("my_app/__init__.py").compress_size
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_build_standard_min_compression_savings(jobs, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(jobs=jobs, **{"min-compression-savings": 0.1})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_bytes(b"def main(): pass\n" * 1000)
+    Path(builder.root, "src", "my_app", "logger.py").write_bytes(os.urandom(10000))
+
+    artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path, "r") as zf:
+        assert zf.testzip() is None
+        assert zf.getinfo("my_app/app.py").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("my_app/logger.py").compress_type == zipfile.ZIP_STORED
+
+
+def test_build_standard_compression_rules_extract(pyz_builder_factory, tmp_path):
+    rules = [{"pattern": "my_app/*", "method": "lzma"}]
+    builder: PythonZipappBuilder = pyz_builder_factory(**{"compression-rules": rules})
+    with pytest.raises(ValueError, match="requires `extract` to be enabled"):
+        _ = builder.config.compression_rules
+
+    builder = pyz_builder_factory(extract=True, **{"compression-rules": rules})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    Path(builder.root, "src", "my_app", "app.py").write_text("def main():\n    pass\n")
+    artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path, "r") as zf:
+        assert zf.getinfo("my_app/app.py").compress_type == zipfile.ZIP_LZMA
+        assert zf.getinfo("_hatch_pyz/extract.py").compress_type == zipfile.ZIP_DEFLATED
+    subprocess.check_call([sys.executable, artifact_path], env={**os.environ, "HATCH_PYZ_ROOT": str(tmp_path)})
+
+
+@pytest.mark.parametrize(
+    ("rule", "error"),
+    [
+        ({"method": "stored"}, "`pattern` in rule #1"),
+        ({"pattern": "*", "method": "zstd"}, "`method` in rule #1"),
+        ({"pattern": "*", "method": "stored", "level": 1}, "not supported by `stored`"),
+        ({"pattern": "*", "method": "bzip2", "level": 0}, "between 1 and 9"),
+    ],
+)
+def test_compression_rules_invalid(rule, error, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(extract=True, **{"compression-rules": [rule]})
+
+    with pytest.raises((TypeError, ValueError), match=error):
+        _ = builder.config.compression_rules
+
+
+def test_build_standard_report(pyz_builder_factory):
+    def fake_pip_install(dependencies, target_directory):
+        make_files(Path(target_directory), ["flask/__init__.py", "flask-3.0.dist-info/METADATA"])
+        Path(target_directory, "flask", "__init__.py").write_bytes(b"import os\n" * 100)
+        Path(target_directory, "flask-3.0.dist-info", "RECORD").write_text(
+            "flask/__init__.py,sha256=abc,1000\nflask-3.0.dist-info/METADATA,,\nflask-3.0.dist-info/RECORD,,\n"
+        )
+
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=["flask"], report=True, jobs=2)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install):
+        artifact_path = builder.build_standard(str(build_dir))
+
+    report = json.loads(Path(f"{artifact_path}.report.json").read_text())
+    assert {
+        "install-dependencies",
+        "wait-dependencies",
+        "scan-dependencies",
+        "select-files",
+        "write-archive",
+        "replace-file",
+    } == set(report["phases"])
+    assert report["background_phases"] == ["install-dependencies"]
+    assert set(report["packages"]) == {"my-app", "flask", "(generated)"}
+    assert report["packages"]["flask"]["entries"] == 3
+    entries = {entry["filename"]: entry for entry in report["entries"]}
+    assert entries["flask/__init__.py"]["file_size"] == 1000
+    assert entries["flask/__init__.py"]["compress_size"] < 1000
+    assert report["total"]["entries"] == len(entries) == 7
+
+    # disabling the report removes the stale one, and the dependency files are no longer attributed
+    builder = pyz_builder_factory(report=False)
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install), patch.object(
+        hatch_pyz.builder, "read_record"
+    ) as mock_read_record:
+        builder.build_standard(str(build_dir))
+    assert not Path(f"{artifact_path}.report.json").exists()
+    mock_read_record.assert_not_called()
+
+
+def test_build_standard_prune_dependencies(pyz_builder_factory):
+    sources = {
+        "requests/__init__.py": "from . import api\nfrom .compat import json\n",
+        "requests/__init__.pyi": "",
+        "requests/api.py": "def get():\n    import urllib3\n",
+        "requests/compat.py": "import json\n",
+        "requests/cacert.pem": "",
+        "requests/tests/test_api.py": "import pytest\n",
+        "requests-2.0.dist-info/METADATA": "",
+        "urllib3/__init__.py": "",
+        "unused/__init__.py": "",
+        "unused/data.txt": "unused" * 100,
+        "unused-1.0.dist-info/METADATA": "",
+        "plugin/__init__.py": "",
+    }
+
+    def fake_pip_install(dependencies, target_directory):
+        for name, source in sources.items():
+            path = Path(target_directory, name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(source)
+        for dist_info, files in (
+            ("requests-2.0.dist-info", ["requests/__init__.py", "requests/api.py"]),
+            ("unused-1.0.dist-info", ["unused/__init__.py", "unused/data.txt"]),
+        ):
+            Path(target_directory, dist_info, "RECORD").write_text(
+                "".join(f"{name},,\n" for name in [*files, f"{dist_info}/METADATA", f"{dist_info}/RECORD"])
+            )
+
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        dependencies=["requests", "unused", "plugin"],
+        report=True,
+        **{"tree-shake": True, "tree-shake-keep": ["plugin"], "dependency-exclude": ["tests/", "*.pyi"]},
+    )
+    Path(builder.root, "src/my_app/app.py").write_text("import requests\n")
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install):
+        artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path) as zf:
+        names = set(zf.namelist())
+    assert {
+        "requests/__init__.py",
+        "requests/api.py",
+        "requests/compat.py",
+        "requests/cacert.pem",
+        "requests-2.0.dist-info/METADATA",
+        "requests-2.0.dist-info/RECORD",
+        "urllib3/__init__.py",
+        "plugin/__init__.py",
+    } <= names
+    assert not {name for name in names if name.startswith(("unused", "requests/tests/"))}
+    assert "requests/__init__.pyi" not in names
+
+    report = json.loads(Path(f"{artifact_path}.report.json").read_text())
+    assert report["pruned"]["unused"]["files"] == 4
+    assert report["pruned"]["unused"]["bytes"] > 600
+    assert report["pruned"]["requests"] == {"files": 2, "bytes": len("import pytest\n")}
+
+
+def test_build_standard_stream_wheels(pyz_builder_factory):
+    def fake_pip_wheel(dependencies, wheel_directory):
+        with zipfile.ZipFile(Path(wheel_directory, "requests-2.0-py3-none-any.whl"), "w") as wheel:
+            wheel.writestr("requests/__init__.py", "import json\n" * 100, zipfile.ZIP_DEFLATED)
+            wheel.writestr("requests/cacert.pem", "certificate\n" * 100, zipfile.ZIP_STORED)
+            wheel.writestr("requests-2.0.data/purelib/requests_extra.py", "", zipfile.ZIP_DEFLATED)
+            wheel.writestr("requests-2.0.data/scripts/requests", "#!python\n", zipfile.ZIP_DEFLATED)
+            wheel.writestr("requests-2.0.dist-info/METADATA", "Name: requests\n", zipfile.ZIP_DEFLATED)
+            wheel_sizes.update({info.filename: info.compress_size for info in wheel.infolist()})
+
+    wheel_sizes = {}
+
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        dependencies=["requests"], compressed=True, report=True, **{"stream-wheels": True}
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with patch.object(hatch_pyz.builder, "pip_wheel", side_effect=fake_pip_wheel), patch.object(
+        hatch_pyz.builder, "pip_install"
+    ) as mock_pip_install:
+        artifact_path = builder.build_standard(str(build_dir))
+    mock_pip_install.assert_not_called()
+
+    with zipfile.ZipFile(artifact_path) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        assert names[-4:] == [
+            "requests/__init__.py",
+            "requests/cacert.pem",
+            "requests_extra.py",
+            "requests-2.0.dist-info/METADATA",
+        ]
+        assert zf.read("requests/__init__.py") == b"import json\n" * 100
+        # copied without recompressing
+        assert zf.getinfo("requests/__init__.py").compress_size == wheel_sizes["requests/__init__.py"]
+        assert zf.getinfo("requests/cacert.pem").compress_type == zipfile.ZIP_DEFLATED
+
+    report = json.loads(Path(f"{artifact_path}.report.json").read_text())
+    assert report["packages"]["requests"]["entries"] == 4
+
+
+def test_build_standard_lock_file(pyz_builder_factory, tmp_path, monkeypatch):
+    index = tmp_path / "index"
+    index.mkdir()
+    make_wheel(index, "alpha", "1.0", ["beta>=1"])
+    make_wheel(index, "beta", "1.0")
+    make_wheel(index, "beta", "2.0")
+    monkeypatch.setenv("PIP_NO_INDEX", "1")
+    monkeypatch.setenv("PIP_FIND_LINKS", str(index))
+
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        dependencies=["alpha"], **{"lock-file": "pyz.lock", "wheelhouse": str(tmp_path / "wheelhouse")}
+    )
+    assert main(["--root", builder.root, "lock"]) == 0
+    lock = json.loads(Path(builder.root, "pyz.lock").read_text())
+    locked = [(package["name"], package["version"]) for package in lock["packages"]]
+    assert locked == [("alpha", "1.0"), ("beta", "2.0")]
+
+    # a newer release does not change what a locked build installs
+    make_wheel(index, "beta", "3.0")
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    artifact_path = builder.build_standard(str(build_dir))
+    assert sorted(os.listdir(tmp_path / "wheelhouse")) == ["alpha-1.0-py3-none-any.whl", "beta-2.0-py3-none-any.whl"]
+    with zipfile.ZipFile(artifact_path) as zf:
+        assert zf.read("beta/__init__.py") == b"VERSION = '2.0'\n"
+        assert "beta-2.0.dist-info/METADATA" in zf.namelist()
+
+    # streamed wheels come straight from the wheelhouse
+    lock_file = Path(builder.root, "pyz.lock")
+    builder = pyz_builder_factory(**{"stream-wheels": True})
+    Path(builder.root, "pyz.lock").write_bytes(lock_file.read_bytes())
+    with patch.object(hatch_pyz.builder, "pip_wheel") as mock_pip_wheel:
+        artifact_path = builder.build_standard(str(build_dir))
+    mock_pip_wheel.assert_not_called()
+    with zipfile.ZipFile(artifact_path) as zf:
+        assert zf.read("beta/__init__.py") == b"VERSION = '2.0'\n"
+
+
+def test_build_standard_lock_file_hash_mismatch(pyz_builder_factory, tmp_path, monkeypatch):
+    index = tmp_path / "index"
+    index.mkdir()
+    make_wheel(index, "alpha", "1.0")
+    monkeypatch.setenv("PIP_NO_INDEX", "1")
+    monkeypatch.setenv("PIP_FIND_LINKS", str(index))
+
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        dependencies=["alpha"], **{"lock-file": "pyz.lock", "wheelhouse": str(tmp_path / "wheelhouse")}
+    )
+    main(["--root", builder.root, "lock"])
+    make_wheel(index, "alpha", "1.0", ["beta"])
+
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    with pytest.raises(ValueError, match="Hash mismatch"):
+        builder.build_standard(str(build_dir))
+    assert not os.listdir(tmp_path / "wheelhouse")
+
+
+def test_build_standard_lock_file_outdated(pyz_builder_factory, tmp_path):
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=["alpha"], **{"lock-file": "pyz.lock"})
+    LockFile(["beta"], []).write(str(Path(builder.root, "pyz.lock")))
+
+    with pytest.raises(ValueError, match="out of date"):
+        builder.build_standard(str(tmp_path))
+
+
+def test_build_standard_matrix(pyz_builder_factory, tmp_path):
+    matrix = [
+        {"name": "stored", "compressed": False, "interpreter": "/usr/bin/python3"},
+        {"name": "slim", "bundle-dependencies": False},
+        {"name": "extract", "extract": True, "compile-bytecode": True},
+    ]
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=["requests"], matrix=matrix)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with patch.object(hatch_pyz.builder, "pip_install") as mock_pip_install:
+        mock_pip_install.side_effect = lambda deps, target_dir: make_files(Path(target_dir), ["requests/__init__.py"])
+        artifact_path = builder.build_standard(str(build_dir))
+    mock_pip_install.assert_called_once()
+
+    assert artifact_path == str(build_dir / "my_app-0.0.1.pyz")
+    assert sorted(os.listdir(build_dir)) == [
+        "my_app-0.0.1-extract.pyz",
+        "my_app-0.0.1-slim.pyz",
+        "my_app-0.0.1-stored.pyz",
+        "my_app-0.0.1.pyz",
+    ]
+    with zipfile.ZipFile(build_dir / "my_app-0.0.1-slim.pyz") as zf:
+        assert "requests/__init__.py" not in zf.namelist()
+
+    # every variant is identical to a standalone build with its options
+    for variant in matrix:
+        standalone = hatch_pyz.builder.PythonZipappBuilder(
+            builder.root, config=builder.get_variant_config({k: v for k, v in variant.items() if k != "name"})
+        )
+        standalone_dir = tmp_path / variant["name"]
+        standalone_dir.mkdir()
+        with patch.object(hatch_pyz.builder, "pip_install") as mock_pip_install:
+            mock_pip_install.side_effect = lambda deps, target_dir: make_files(
+                Path(target_dir), ["requests/__init__.py"]
+            )
+            standalone_path = standalone.build_standard(str(standalone_dir))
+        assert md5_file_digest(standalone_path) == md5_file_digest(build_dir / f"my_app-0.0.1-{variant['name']}.pyz")
+
+
+@pytest.mark.parametrize(
+    ("matrix", "error"),
+    [
+        ({"name": "a"}, "must be an array of tables"),
+        ([{"compressed": False}], "Option `name` in variant #1"),
+        ([{"name": "a b"}], "Option `name` in variant #1"),
+        ([{"name": "a"}, {"name": "a"}], "is not unique"),
+        ([{"name": "a", "dependency-cache": True}], "cannot vary by variant: `dependency-cache`"),
+    ],
+)
+def test_matrix_invalid(matrix, error, pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(matrix=matrix)
+
+    with pytest.raises((TypeError, ValueError), match=error):
+        _ = builder.config.matrix
+
+
+def test_inspect_and_diff(pyz_builder_factory, tmp_path, capsys):
+    def fake_pip_install(dependencies, target_directory):
+        make_files(Path(target_directory), ["six.py", "six-1.0.dist-info/METADATA"])
+        Path(target_directory, "six.py").write_text("import sys\n" * 100)
+        Path(target_directory, "six-1.0.dist-info/RECORD").write_text(
+            "six.py,,\nsix-1.0.dist-info/METADATA,,\nsix-1.0.dist-info/RECORD,,\n"
+        )
+
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=["six"])
+    Path(builder.root, "src/my_app/app.py").write_text("def main():\n    pass\n" * 50)
+    Path(builder.root, "src/my_app/logger.py").write_text("def main():\n    pass\n" * 50)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install):
+        old_path = builder.build_standard(str(build_dir))
+        os.replace(old_path, tmp_path / "old.pyz")
+        Path(builder.root, "src/my_app/logger.py").write_text("")
+        Path(builder.root, "src/my_app/util.py").write_text("")
+        new_path = builder.build_standard(str(build_dir))
+
+    assert main(["inspect", str(tmp_path / "old.pyz"), "--json"]) == 0
+    analysis = json.loads(capsys.readouterr().out)
+    assert analysis["total"]["entries"] == 7
+    assert analysis["methods"] == {"deflated": 7}
+    assert analysis["packages"]["my_app"]["entries"] == 3
+    assert analysis["packages"]["six"]["file_size"] == len("import sys\n" * 100)
+    assert analysis["distributions"]["six"]["entries"] == 3
+    assert analysis["distributions"]["(unknown)"]["entries"] == 4
+    assert [duplicate["filenames"] for duplicate in analysis["duplicates"]] == [
+        ["my_app/app.py", "my_app/logger.py"]
+    ]
+
+    assert main(["inspect", str(tmp_path / "old.pyz")]) == 0
+    assert "1 sets of duplicate contents" in capsys.readouterr().out
+
+    assert main(["diff", str(tmp_path / "old.pyz"), new_path, "--json"]) == 0
+    diff = json.loads(capsys.readouterr().out)
+    assert diff["new"]["entries"] - diff["old"]["entries"] == 1
+    assert list(diff["packages"]) == ["my_app"]
+    assert {entry["filename"]: entry["status"] for entry in diff["entries"]} == {
+        "my_app/logger.py": "changed",
+        "my_app/util.py": "added",
+    }
+
+    assert main(["diff", str(tmp_path / "old.pyz"), new_path]) == 0
+    assert "0 removed" in capsys.readouterr().out
+
+
+def test_build_standard_skip_unchanged(pyz_builder_factory):
+    builder: PythonZipappBuilder = pyz_builder_factory(**{"skip-unchanged": True})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    def build(project: PythonZipappBuilder = builder) -> bool:
+        with patch.object(project, "build_artifact", wraps=project.build_artifact) as build_artifact:
+            assert project.build_standard(str(build_dir)) == str(build_dir / "my_app-0.0.1.pyz")
+        return build_artifact.called
+
+    assert build()
+    assert Path(f"{build_dir}/my_app-0.0.1.pyz.fingerprint").exists()
+    assert not build()
+
+    # a new modification time alone is not a change, but new content is
+    logger = Path(builder.root, "src/my_app/logger.py")
+    os.utime(logger, (0, 0))
+    assert not build()
+    logger.write_text("import logging\n")
+    assert build()
+    assert not build()
+
+    # as are changed options and a missing or modified artifact
+    config = builder.metadata.config
+    config["tool"]["hatch"]["build"]["targets"]["pyz"]["compressed"] = False
+    assert build(hatch_pyz.builder.PythonZipappBuilder(builder.root, config=config))
+    assert not build(hatch_pyz.builder.PythonZipappBuilder(builder.root, config=config))
+    Path(build_dir / "my_app-0.0.1.pyz").write_bytes(b"")
+    assert build(hatch_pyz.builder.PythonZipappBuilder(builder.root, config=config))
+
+
+@pytest.mark.parametrize("stream_wheels", [False, True])
+def test_build_standard_layered(stream_wheels, pyz_builder_factory, tmp_path):
+    def fake_pip_install(dependencies, target_directory):
+        for dependency in dependencies:
+            Path(target_directory, f"{dependency}.py").write_text(f"NAME = {dependency!r}\n")
+
+    def fake_pip_wheel(dependencies, wheel_directory):
+        for dependency in dependencies:
+            with zipfile.ZipFile(Path(wheel_directory, f"{dependency}-1.0-py3-none-any.whl"), "w") as wheel:
+                wheel.writestr(f"{dependency}.py", f"NAME = {dependency!r}\n")
+
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        dependencies=["six"], layered=True, reproducible=True, **{"stream-wheels": stream_wheels}
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    app = Path(builder.root, "src", "my_app", "app.py")
+    app.write_text("import six\n\n\ndef main():\n    print(six.NAME)\n")
+
+    def build(project: PythonZipappBuilder = builder) -> tuple[str, list[str]]:
+        with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install), patch.object(
+            hatch_pyz.builder, "pip_wheel", side_effect=fake_pip_wheel
+        ):
+            artifact_path = project.build_standard(str(build_dir))
+        return artifact_path, sorted(path.name for path in build_dir.glob("*-deps-*.pyz"))
+
+    artifact_path, layers = build()
+    assert len(layers) == 1
+    with zipfile.ZipFile(artifact_path) as zf:
+        assert "six.py" not in zf.namelist()
+        assert layers[0] in zf.read("__main__.py").decode()
+    with zipfile.ZipFile(build_dir / layers[0]) as zf:
+        assert zf.namelist() == ["six.py"]
+    assert not (build_dir / layers[0]).read_bytes().startswith(b"#!")
+
+    result = subprocess.run([sys.executable, artifact_path], capture_output=True, text=True, check=True)
+    assert result.stdout == "six\n"
+
+    # the layer only changes with the dependencies
+    layer_stat = os.stat(build_dir / layers[0])
+    app.write_text("import six\n\n\ndef main():\n    print(six.NAME.upper())\n")
+    assert build()[1] == layers
+    assert os.stat(build_dir / layers[0]).st_mtime_ns == layer_stat.st_mtime_ns
+
+    # the application looks for its layer next to it, then on HATCH_PYZ_LAYER_PATH
+    moved = tmp_path / "moved.pyz"
+    shutil.copy(artifact_path, moved)
+    result = subprocess.run([sys.executable, str(moved)], capture_output=True, text=True, check=False)
+    assert result.returncode == 1
+    assert layers[0] in result.stderr
+    env = {**os.environ, "HATCH_PYZ_LAYER_PATH": str(build_dir)}
+    result = subprocess.run([sys.executable, str(moved)], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout == "SIX\n"
+
+    config = builder.metadata.config
+    config["project"]["dependencies"] = ["attrs"]
+    _, new_layers = build(hatch_pyz.builder.PythonZipappBuilder(builder.root, config=config))
+    assert len(new_layers) == 2
+
+    with pytest.raises(ValueError, match="cannot be combined with `extract`"):
+        _ = pyz_builder_factory(layered=True, extract=True).config.layered
+
+
+def test_build_standard_layered_failure(pyz_builder_factory, tmp_path, monkeypatch):
+    temp_dir = tmp_path / "temp"
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_dir))
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=["six"], layered=True, **{"stream-wheels": False})
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=OSError("pip failed")), pytest.raises(
+        OSError, match="pip failed"
+    ):
+        builder.build_standard(str(build_dir))
+
+    # neither the archive nor its layer is left behind
+    assert not list(temp_dir.rglob("*.pyz"))
+    assert not list(build_dir.iterdir())
+
+
+def test_build_standard_pipelined(pyz_builder_factory):
+    project_files_written = threading.Event()
+
+    def fake_pip_install(dependencies, target_directory):
+        # only finishes if the project files are written while dependencies are installed
+        assert project_files_written.wait(timeout=10)
+        Path(target_directory, "six.py").write_text("")
+
+    builder: PythonZipappBuilder = pyz_builder_factory(dependencies=["six"])
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    recurse_included_files = builder.recurse_included_files
+
+    def recurse_and_notify():
+        yield from recurse_included_files()
+        project_files_written.set()
+
+    with patch.object(hatch_pyz.builder, "pip_install", side_effect=fake_pip_install), patch.object(
+        builder, "recurse_included_files", side_effect=recurse_and_notify
+    ):
+        artifact_path = builder.build_standard(str(build_dir))
+
+    with zipfile.ZipFile(artifact_path) as zf:
+        assert zf.namelist()[-1] == "six.py"
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_watch(compressed, pyz_builder_factory, tmp_path):
+    builder: PythonZipappBuilder = pyz_builder_factory(compressed=compressed)
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    app = Path(builder.root, "src", "my_app", "app.py")
+    app.write_text("def main():\n    print('one')\n")
+
+    watcher = Watcher(lambda: hatch_pyz.builder.PythonZipappBuilder(builder.root), str(build_dir))
+    artifact_path = watcher.target
+    assert not watcher.poll()
+
+    app.write_text("def main():\n    print('two')\n")
+    Path(builder.root, "src", "my_app", "util.py").write_text("VALUE = 1\n")
+    Path(builder.root, "src", "my_app", "logger.py").unlink()
+    assert watcher.poll()
+    assert watcher.updated
+    assert watcher.wasted > 0
+
+    with zipfile.ZipFile(artifact_path) as zf:
+        assert zf.testzip() is None
+        assert "my_app/logger.py" not in zf.namelist()
+        assert zf.read("my_app/util.py") == b"VALUE = 1\n"
+    result = subprocess.run([sys.executable, artifact_path], capture_output=True, text=True, check=True)
+    assert result.stdout == "two\n"
+
+    # compacting produces the same bytes as a clean build
+    watcher.compact()
+    assert not watcher.updated
+    clean_dir = tmp_path / "clean"
+    clean_dir.mkdir()
+    clean_path = hatch_pyz.builder.PythonZipappBuilder(builder.root).build_standard(str(clean_dir))
+    assert md5_file_digest(artifact_path) == md5_file_digest(clean_path)
+
+    # past the threshold, updates are compacted right away
+    watcher.compact_threshold = 0
+    app.write_text("def main():\n    print('three')\n")
+    assert watcher.poll()
+    assert not watcher.updated
+
+
+def test_watch_compression(pyz_builder_factory, tmp_path):
+    builder: PythonZipappBuilder = pyz_builder_factory(
+        files=["src/my_app/__init__.py", "src/my_app/app.py", "src/my_app/data.txt", "src/my_app/logo.png"],
+        **{"min-compression-savings": 0.1, "compression-rules": [{"pattern": "*.png", "method": "stored"}]},
+    )
+    build_dir = Path(builder.config.directory)
+    build_dir.mkdir()
+    package = Path(builder.root, "src", "my_app")
+    (package / "data.txt").write_text("data\n" * 1000)
+    (package / "logo.png").write_bytes(b"\0" * 1000)
+
+    watcher = Watcher(lambda: hatch_pyz.builder.PythonZipappBuilder(builder.root), str(build_dir))
+    # incompressible data is stored by a full build, and so must be by an update
+    (package / "data.txt").write_bytes(os.urandom(10_000))
+    (package / "logo.png").write_bytes(b"\1" * 1000)
+    assert watcher.poll()
+    assert watcher.updated
+
+    clean_dir = tmp_path / "clean"
+    clean_dir.mkdir()
+    clean_path = hatch_pyz.builder.PythonZipappBuilder(builder.root).build_standard(str(clean_dir))
+    with zipfile.ZipFile(watcher.target) as updated, zipfile.ZipFile(clean_path) as clean:
+        assert updated.getinfo("my_app/data.txt").compress_type == zipfile.ZIP_STORED
+        assert {info.filename: (info.compress_type, info.CRC) for info in updated.infolist()} == {
+            info.filename: (info.compress_type, info.CRC) for info in clean.infolist()
+        }
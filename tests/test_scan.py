@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+
+from hatch_pyz.scan import ScannedFile, get_stat, scan_tree
+from tests.conftest import make_files
+
+
+def test_scan_tree(tmp_path):
+    make_files(tmp_path, ["b.py", "a/z.py", "a/b/c.py", "a.txt", "c/d.py"])
+    (tmp_path / "a" / "y.py").write_text("print()\n")
+    os.symlink(tmp_path / "a", tmp_path / "link")
+
+    scanned = list(scan_tree(str(tmp_path)))
+    # the order of a sorted `os.walk`, which does not follow the symbolic link either
+    assert [path for path, _ in scanned] == ["a.txt", "b.py", "a/y.py", "a/z.py", "a/b/c.py", "c/d.py"]
+    assert dict(scanned)["a/y.py"].st_size == len("print()\n")
+
+
+def test_get_stat(tmp_path):
+    path = tmp_path / "file.py"
+    path.write_text("")
+    file_stat = os.stat(path)
+
+    scanned = ScannedFile(str(path), "file.py", "file.py", file_stat)
+    path.write_text("changed")
+    assert get_stat(scanned) is file_stat
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import zlib
+
+import pytest
+
+from hatch_pyz import stored
+from hatch_pyz.stored import copy_data, get_checksums
+
+
+def unsupported(*_args):
+    raise OSError(errno.ENOSYS, "not supported")
+
+
+@pytest.mark.parametrize(
+    "copy_functions",
+    [
+        pytest.param(stored.get_copy_functions(), id="default"),
+        pytest.param(
+            [unsupported, stored.sendfile],
+            id="sendfile",
+            marks=pytest.mark.skipif(not hasattr(os, "sendfile"), reason="requires os.sendfile"),
+        ),
+        pytest.param([unsupported], id="fallback"),
+    ],
+)
+def test_copy_data(tmp_path, monkeypatch, copy_functions):
+    monkeypatch.setattr(stored, "get_copy_functions", lambda: copy_functions)
+    data = os.urandom(100_000)
+    source = tmp_path / "source"
+    source.write_bytes(data)
+
+    with open(source, "rb") as in_file, open(tmp_path / "destination", "w+b") as out_file:
+        out_file.write(b"header")
+        assert copy_data(in_file, out_file, len(data)) == len(data)
+        out_file.write(b"footer")
+        # a shorter file is reported rather than padded
+        assert copy_data(in_file, out_file, len(data) + 1) == len(data)
+
+    assert (tmp_path / "destination").read_bytes() == b"header" + data + b"footer" + data
+
+
+@pytest.mark.parametrize("size", [0, 1, 100_000])
+def test_get_checksums(tmp_path, size):
+    data = os.urandom(size)
+    (tmp_path / "file").write_bytes(data)
+
+    with open(tmp_path / "file", "rb") as in_file:
+        assert get_checksums(in_file, size, digest=True) == (zlib.crc32(data), hashlib.sha256(data).hexdigest())
+        assert get_checksums(in_file, size) == (zlib.crc32(data), None)